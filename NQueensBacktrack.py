@@ -0,0 +1,82 @@
+﻿from NQueensCore import Solution, print_solution
+from NQueensStats import NO_STATS
+
+# Quay lui trên bitboard: mỗi hàng giữ 3 mặt nạ bit cho cột, đường chéo chính và đường chéo phụ
+# đã bị chiếm, bit j ứng với cột j. Với n nhỏ (khoảng ≤ 30) cách này tìm được lời giải nhanh hơn
+# cả thời gian dựng Glucose3 và nạp mệnh đề.
+
+# PARAMETERS:
+#   n: kích thước bàn cờ
+#   limits: danh sách mặt nạ cho các hàng đầu tiên, limits[r] giới hạn các cột được đặt hậu ở hàng r
+# RETURN: lần lượt từng cách đặt dưới dạng list queens (queens[i] = cột của hậu ở hàng i).
+#         List này được dùng lại giữa các lần yield, cần sao chép nếu muốn giữ.
+def _placements(n, limits=()):
+    if n <= 0:
+        return
+    full = (1 << n) - 1
+    queens = [0] * n
+    cols = [0] * n      # cols[r], diag1[r], diag2[r]: các ô bị chiếm ở hàng r do các hậu phía trên
+    diag1 = [0] * n
+    diag2 = [0] * n
+    avail = [0] * n     # avail[r]: các cột còn chưa thử ở hàng r
+    avail[0] = full & (limits[0] if limits else full)
+
+    row = 0
+    while row >= 0:
+        free = avail[row]
+        if not free:
+            row -= 1
+            continue
+        bit = free & -free      # bit thấp nhất còn trống
+        avail[row] = free ^ bit
+        queens[row] = bit.bit_length() - 1
+        if row == n - 1:
+            yield queens
+            continue
+
+        c = cols[row] | bit
+        d1 = ((diag1[row] | bit) << 1) & full       # đường chéo xuống phải
+        d2 = (diag2[row] | bit) >> 1                # đường chéo xuống trái
+        row += 1
+        cols[row], diag1[row], diag2[row] = c, d1, d2
+        free = full & ~(c | d1 | d2)
+        if row < len(limits):
+            free &= limits[row]
+        avail[row] = free
+
+# RETURN: Solution đầu tiên tìm được, hoặc None nếu không có lời giải
+def find_solution_backtrack(n, stats=None):
+    stats = stats or NO_STATS
+    stats.record(n=n, backend="backtrack")
+    with stats.phase("search"):
+        queens = next(_placements(n), None)
+    solution = Solution(queens) if queens is not None else None
+    stats.finish(solution)
+    return solution
+
+# RETURN: lần lượt mọi lời giải (Solution) của bàn cờ n x n
+def iter_solutions_backtrack(n):
+    for queens in _placements(n):
+        yield Solution(queens)
+
+def count_solutions_backtrack(n):
+    """
+    Đếm số lời giải có dùng đối xứng gương trái - phải:
+      - Hậu ở hàng đầu nằm nửa trái (cột < n // 2): mỗi lời giải có đúng một ảnh gương ở nửa phải -> nhân 2.
+      - Nếu n lẻ và hậu hàng đầu ở cột giữa: hậu ở hàng 2 không thể ở cột giữa,
+        nên chỉ xét hàng 2 ở nửa trái rồi nhân 2.
+    """
+    if n == 1:
+        return 1
+    half = n // 2
+    left = (1 << half) - 1
+    total = 2 * sum(1 for _ in _placements(n, [left]))
+    if n % 2 == 1:
+        total += 2 * sum(1 for _ in _placements(n, [1 << half, left]))
+    return total
+
+
+if __name__ == "__main__":
+    n = 8  # Thay đổi kích thước theo ý muốn
+    print_solution(find_solution_backtrack(n))
+    print("Số lời giải:", count_solutions_backtrack(n))
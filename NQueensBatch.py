@@ -0,0 +1,142 @@
+﻿import argparse
+import itertools
+import json
+import multiprocessing
+import sys
+import time
+from collections import OrderedDict
+
+from NQueensSolver import open_session
+
+# Giải hàng loạt truy vấn (n, các hậu đặt sẵn) trên một pool process.
+# Mỗi dòng JSONL đầu vào là một truy vấn, Ex: {"id": "a1", "n": 8, "placed": [[0, 0], [1, 4]], "encoding": "sequential"}
+# Truy vấn có thể thêm "timeout" (giây) cho cả việc mở phiên (sinh công thức) lẫn việc giải,
+# hết thời gian thì status là "TIMEOUT".
+# Mỗi dòng đầu ra: {"id": ..., "n": ..., "status": "SAT" | "UNSAT" | "TIMEOUT" | "ERROR", "queens": [...], "conflict": [[r, c], ...]}
+# Thứ tự đầu ra luôn giống thứ tự đầu vào.
+
+# Các phiên giải (NQueensSession) đang mở trong process hiện tại, khoá là (n, encoding).
+# Chỉ giữ tối đa _max_sessions phiên (LRU) nên bộ nhớ mỗi worker bị chặn bởi n lớn nhất nó đang giữ.
+_sessions = OrderedDict()
+_max_sessions = 1
+
+# Solver cho các phiên: Minisat kiểm tra interrupt sau mỗi conflict nên timeout của truy vấn được tôn trọng
+# (Glucose chỉ kiểm tra khi restart)
+SESSION_SOLVER = "minisat22"
+
+def _init_worker(max_sessions):
+    global _max_sessions
+    _max_sessions = max_sessions
+
+# deadline: mốc time.perf_counter() khi phải mở xong phiên mới (TimeoutError nếu quá), None là không giới hạn
+def _get_session(n, encoding, deadline=None):
+    key = (n, encoding)
+    if key in _sessions:
+        _sessions.move_to_end(key)
+        return _sessions[key]
+    while len(_sessions) >= _max_sessions:
+        _, old = _sessions.popitem(last=False)
+        old.close()
+    session = _sessions[key] = open_session(n, encoding, SESSION_SOLVER, deadline=deadline)
+    return session
+
+# RETURN: dict kết quả của một truy vấn
+def solve_instance(instance):
+    result = {"id": instance.get("id"), "n": instance.get("n")}
+    try:
+        n = int(instance["n"])
+        placed = [tuple(p) for p in instance.get("placed", ())]
+        timeout = instance.get("timeout")
+        deadline = None if timeout is None else time.perf_counter() + float(timeout)
+        session = _get_session(n, instance.get("encoding", "sequential"), deadline)
+        remaining = None if deadline is None else deadline - time.perf_counter()
+        if remaining is not None and remaining <= 0:
+            raise TimeoutError("Deadline passed while opening the session")
+        completion = session.complete(placed, remaining)
+    except TimeoutError:
+        result.update(status="TIMEOUT")
+        return result
+    except Exception as e:
+        result.update(status="ERROR", error=str(e))
+        return result
+
+    if completion.solution is not None:
+        result.update(status="SAT", queens=completion.solution.queens)
+    elif completion.conflict is None:
+        result.update(status="TIMEOUT")
+    else:
+        result.update(status="UNSAT", conflict=[list(p) for p in completion.conflict])
+    return result
+
+# Worker giải một shard: danh sách (chỉ số, truy vấn) có cùng (n, encoding)
+def _solve_shard(shard):
+    return [(index, solve_instance(instance)) for index, instance in shard]
+
+# Gom các truy vấn cùng (n, encoding) vào các shard liên tiếp để worker dùng lại phiên đang mở
+def _make_shards(chunk, shard_size):
+    def key(item):
+        instance = item[1]
+        return (str(instance.get("encoding", "sequential")), str(instance.get("n")))
+    shards = []
+    for _, group in itertools.groupby(sorted(chunk, key=key), key=key):
+        group = list(group)
+        for start in range(0, len(group), shard_size):
+            shards.append(group[start:start + shard_size])
+    return shards
+
+# PARAMETERS:
+#   instances: iterable các truy vấn (dict), có thể là luồng vô hạn
+#   workers: số process, mặc định bằng số CPU
+#   chunk_size: số truy vấn đọc vào mỗi lần; kết quả được trả về theo từng chunk
+#   shard_size: số truy vấn tối đa trong một shard gửi cho worker
+#   max_sessions: số phiên giải tối đa mỗi worker giữ cùng lúc
+# RETURN: lần lượt các kết quả (dict) theo đúng thứ tự đầu vào
+def solve_batch(instances, workers=None, chunk_size=1024, shard_size=64, max_sessions=1):
+    instances = enumerate(instances)
+    with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(max_sessions,)) as pool:
+        while True:
+            chunk = list(itertools.islice(instances, chunk_size))
+            if not chunk:
+                break
+            results = {}
+            for shard_results in pool.imap_unordered(_solve_shard, _make_shards(chunk, shard_size)):
+                results.update(shard_results)
+            for index, _ in chunk:
+                yield results[index]
+
+def _read_jsonl(f):
+    for line in f:
+        if line.strip():
+            yield json.loads(line)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Giải hàng loạt truy vấn N-Queens từ JSONL.")
+    parser.add_argument("input", nargs="?", default="-", help="file JSONL đầu vào (mặc định: stdin)")
+    parser.add_argument("-o", "--output", default="-", help="file JSONL đầu ra (mặc định: stdout)")
+    parser.add_argument("--workers", type=int, help="số process (mặc định: số CPU)")
+    parser.add_argument("--chunk-size", type=int, default=1024)
+    parser.add_argument("--shard-size", type=int, default=64)
+    parser.add_argument("--max-sessions", type=int, default=1, help="số phiên giải tối đa mỗi worker giữ cùng lúc")
+    args = parser.parse_args(argv)
+
+    fin = sys.stdin if args.input == "-" else open(args.input)
+    fout = sys.stdout if args.output == "-" else open(args.output, "w")
+    start = time.perf_counter()
+    count = 0
+    try:
+        for result in solve_batch(_read_jsonl(fin), args.workers, args.chunk_size, args.shard_size, args.max_sessions):
+            fout.write(json.dumps(result) + "\n")
+            count += 1
+    finally:
+        if fin is not sys.stdin:
+            fin.close()
+        if fout is not sys.stdout:
+            fout.close()
+
+    elapsed = time.perf_counter() - start
+    print("Solved %d instances in %.3fs (%.1f instances/s)" % (count, elapsed, count / elapsed if elapsed else 0.0),
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+﻿import argparse
+import csv
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+
+from pysat.solvers import Glucose3
+
+from NQueensCore import generate_variables, generate_clauses
+from NQueensSolver import ENCODINGS, get_encoding
+from NQueensSequential import at_most_one_seq
+from NQueensBinary import at_most_one_binary
+from NQueensProduct import product_amo, nested_product_amo
+from NQueensCommander import commander_at_most_one, recursive_commander_at_most_one
+from NQueensBimander import bimander_amo
+from NQueensLadder import ladder_amo
+
+# So sánh các encoding trên nhiều kích thước n: mỗi lần chạy (trial) ghi lại thời gian sinh mệnh đề,
+# số mệnh đề, số biến phụ, bộ nhớ đỉnh, thời gian giải và thống kê của solver (accum_stats).
+
+FIELDS = ["encoding", "n", "trial", "encode_time", "load_time", "solve_time", "clauses", "aux_vars",
+          "peak_memory", "sat", "conflicts", "decisions", "propagations"]
+
+# Các chỉ số dùng cho chế độ hồi quy: kích thước công thức và thời gian (tính theo trung vị các trial)
+SIZE_METRICS = ("clauses", "aux_vars")
+TIME_METRICS = ("encode_time", "solve_time")
+
+# Các AMO so sánh trên một đường dài (chế độ --lines), cùng chữ ký f(clauses, variables, next_aux_var).
+# Binomial không có ở đây vì đường 10^3 - 10^4 biến cho tới 5 * 10^7 mệnh đề.
+LINE_ENCODERS = {
+    "sequential": at_most_one_seq,
+    "binary": at_most_one_binary,
+    "product": product_amo,
+    "commander": lambda c, v, nx: commander_at_most_one(c, v, 3, nx),
+    "bimander": bimander_amo,
+    "bimander4": lambda c, v, nx: bimander_amo(c, v, nx, 4),
+    "ladder": ladder_amo,
+    "nested_product2": lambda c, v, nx: nested_product_amo(c, v, nx, 2),
+    "nested_product3": lambda c, v, nx: nested_product_amo(c, v, nx, 3),
+    "product3d": lambda c, v, nx: nested_product_amo(c, v, nx, 2, 3),
+    "recursive_commander": lambda c, v, nx: recursive_commander_at_most_one(c, v, 3, nx),
+}
+
+# Số biến được thử làm giả thiết (cách đều nhau trên đường) cho mỗi trial của chế độ --lines
+LINE_SAMPLES = 100
+
+LINE_FIELDS = ["encoding", "length", "trial", "encode_time", "solves", "solve_time", "clauses", "aux_vars",
+               "conflicts", "propagations"]
+
+# PARAMETERS:
+#   name: tên trong LINE_ENCODERS
+#   length: số biến trên đường
+# RETURN: dict kết quả theo LINE_FIELDS (trừ encoding/length/trial). Thời gian giải là tổng của các lần giải
+#         với giả thiết chọn một biến TRUE (tính lan truyền của AMO), mỗi biến thứ max(1, length // LINE_SAMPLES)
+#         (khoảng LINE_SAMPLES lần, ít hơn nếu length < LINE_SAMPLES), cộng một lần chọn hai biến (UNSAT);
+#         solves là tổng số lần giải đó, nên so sánh giữa các length bằng solve_time / solves.
+def run_line_trial(name, length):
+    variables = list(range(1, length + 1))
+    clauses = []
+    start = time.perf_counter()
+    next_aux_var = LINE_ENCODERS[name](clauses, variables, length + 1)
+    encode_time = time.perf_counter() - start
+
+    with Glucose3(bootstrap_with=clauses) as solver:
+        start = time.perf_counter()
+        samples = variables[::max(1, length // LINE_SAMPLES)]
+        for x in samples:
+            solver.solve(assumptions=[x])
+        if solver.solve(assumptions=[variables[0], variables[-1]]):
+            raise RuntimeError("%s allows two true variables on a line of %d" % (name, length))
+        solve_time = time.perf_counter() - start
+        stats = solver.accum_stats() or {}
+
+    return {
+        "encode_time": encode_time,
+        "solves": len(samples) + 1,
+        "solve_time": solve_time,
+        "clauses": len(clauses),
+        "aux_vars": next_aux_var - 1 - length,
+        "conflicts": stats.get("conflicts", 0),
+        "propagations": stats.get("propagations", 0),
+    }
+
+# RETURN: danh sách các dòng kết quả (dict theo LINE_FIELDS)
+def run_line_benchmark(encodings, lengths, trials=3, log=None):
+    rows = []
+    for name in encodings:
+        for length in lengths:
+            for trial in range(trials):
+                row = {"encoding": name, "length": length, "trial": trial}
+                row.update(run_line_trial(name, length))
+                rows.append(row)
+                if log is not None:
+                    log("%-20s length=%-6d trial=%d encode=%.3fs solve=%.3fs (%d solves) clauses=%d aux=%d"
+                        % (name, length, trial, row["encode_time"], row["solve_time"], row["solves"], row["clauses"],
+                           row["aux_vars"]))
+    return rows
+
+# RETURN: bộ nhớ đỉnh (byte) của Python khi sinh công thức, đo riêng vì tracemalloc làm chậm việc sinh mệnh đề
+def measure_peak_memory(n, encoding):
+    tracemalloc.start()
+    try:
+        generate_clauses(n, generate_variables(n), encoding)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+# RETURN: dict kết quả của một lần chạy (các khoá trong FIELDS, trừ encoding/n/trial)
+def run_trial(n, encoding):
+    board = generate_variables(n)
+
+    start = time.perf_counter()
+    formula, next_aux_var = generate_clauses(n, board, encoding)
+    encode_time = time.perf_counter() - start
+
+    with Glucose3() as solver:
+        start = time.perf_counter()
+        formula.to_solver(solver)
+        load_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        sat = solver.solve()
+        solve_time = time.perf_counter() - start
+        stats = solver.accum_stats() or {}
+
+    return {
+        "encode_time": encode_time,
+        "load_time": load_time,
+        "solve_time": solve_time,
+        "clauses": len(formula),
+        "aux_vars": next_aux_var - 1 - n * n,
+        "sat": sat,
+        "conflicts": stats.get("conflicts", 0),
+        "decisions": stats.get("decisions", 0),
+        "propagations": stats.get("propagations", 0),
+    }
+
+# PARAMETERS:
+#   encodings: danh sách tên encoding (trong ENCODINGS)
+#   sizes: danh sách n
+#   trials: số lần chạy lặp lại cho mỗi cặp (encoding, n)
+# RETURN: danh sách các dòng kết quả (dict theo FIELDS)
+def run_benchmark(encodings, sizes, trials=3, params=None, log=None):
+    rows = []
+    for name in encodings:
+        encoding = get_encoding(name, **(params or {}).get(name, {}))
+        for n in sizes:
+            peak_memory = measure_peak_memory(n, encoding)
+            for trial in range(trials):
+                row = {"encoding": name, "n": n, "trial": trial, "peak_memory": peak_memory}
+                row.update(run_trial(n, encoding))
+                rows.append(row)
+                if log is not None:
+                    log("%-10s n=%-4d trial=%d encode=%.3fs solve=%.3fs clauses=%d aux=%d"
+                        % (name, n, trial, row["encode_time"], row["solve_time"], row["clauses"], row["aux_vars"]))
+    return rows
+
+# RETURN: dict (encoding, n) -> trung vị của từng chỉ số qua các trial
+def summarize(rows):
+    groups = {}
+    for row in rows:
+        groups.setdefault((row["encoding"], int(row["n"])), []).append(row)
+    return {key: {metric: statistics.median(float(r[metric]) for r in group)
+                  for metric in SIZE_METRICS + TIME_METRICS}
+            for key, group in groups.items()}
+
+# PARAMETERS:
+#   rows, baseline_rows: kết quả hiện tại và kết quả gốc để so sánh
+#   size_threshold, time_threshold: tỉ lệ tăng tối đa cho phép (Ex: 0.1 = chậm hơn/lớn hơn 10%)
+# RETURN: danh sách thông báo hồi quy, rỗng nếu không có
+def find_regressions(rows, baseline_rows, size_threshold=0.0, time_threshold=0.25):
+    current = summarize(rows)
+    baseline = summarize(baseline_rows)
+    regressions = []
+    for key in sorted(current):
+        if key not in baseline:
+            continue
+        for metric in SIZE_METRICS + TIME_METRICS:
+            threshold = size_threshold if metric in SIZE_METRICS else time_threshold
+            old, new = baseline[key][metric], current[key][metric]
+            if new > old * (1 + threshold):
+                regressions.append("%s n=%d: %s %.6g -> %.6g (+%.1f%%)"
+                                   % (key[0], key[1], metric, old, new, 100.0 * (new - old) / old if old else float("inf")))
+    return regressions
+
+def write_results(rows, path, fields=FIELDS):
+    if path.endswith(".json"):
+        with open(path, "w") as f:
+            json.dump(rows, f, indent=2)
+    else:
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(rows)
+
+def read_results(path):
+    if path.endswith(".json"):
+        with open(path) as f:
+            return json.load(f)
+    with open(path, newline="") as f:
+        return list(csv.DictReader(f))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark các encoding N-Queens.")
+    parser.add_argument("--encodings", nargs="+", default=sorted(ENCODINGS), choices=sorted(ENCODINGS))
+    parser.add_argument("--n", nargs="+", type=int, default=[8, 16, 32], dest="sizes")
+    parser.add_argument("--trials", type=int, default=3)
+    parser.add_argument("--group-size", type=int, default=3, help="kích thước nhóm cho commander encoding")
+    parser.add_argument("--lines", nargs="+", type=int, metavar="LENGTH",
+                        help="so sánh các AMO (LINE_ENCODERS) trên một đường có LENGTH biến thay vì giải N-Queens")
+    parser.add_argument("--line-encodings", nargs="+", default=sorted(LINE_ENCODERS), choices=sorted(LINE_ENCODERS))
+    parser.add_argument("--output", help="ghi kết quả ra file .csv hoặc .json")
+    parser.add_argument("--baseline", help="file kết quả gốc (.csv/.json) để kiểm tra hồi quy")
+    parser.add_argument("--size-threshold", type=float, default=0.0, help="tỉ lệ tăng tối đa cho clauses/aux_vars")
+    parser.add_argument("--time-threshold", type=float, default=0.25, help="tỉ lệ tăng tối đa cho encode_time/solve_time")
+    args = parser.parse_args(argv)
+
+    if args.lines:
+        rows = run_line_benchmark(args.line_encodings, args.lines, args.trials, log=print)
+        if args.output:
+            write_results(rows, args.output, LINE_FIELDS)
+        return 0
+
+    params = {"commander": {"group_size": args.group_size}}
+    rows = run_benchmark(args.encodings, args.sizes, args.trials, params, log=print)
+    if args.output:
+        write_results(rows, args.output)
+
+    if args.baseline:
+        regressions = find_regressions(rows, read_results(args.baseline), args.size_threshold, args.time_threshold)
+        for message in regressions:
+            print("REGRESSION:", message)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+﻿from NQueensCore import at_least_one, make_encoding, solve_with_encoding, print_solution
+
+# Ký tự: ∨
+
+def check_group_size(group_size):
+    if not isinstance(group_size, int) or group_size < 2:
+        raise ValueError("Bimander group_size must be an integer >= 2, got %r" % (group_size,))
+
+# PARAMETERS:
+#   clauses: danh sách các mệnh đề đang có
+#   variables: các biến cần ràng buộc AMO
+#   next_aux_var: ID biến tiếp theo để cấp phát các biến phụ
+#   group_size: số biến trong mỗi nhóm
+# RETURN: trả về next_aux_var sau khi đã cấp phát các biến phụ.
+def bimander_amo(clauses, variables, next_aux_var, group_size=2):
+    """
+    Bimander (kết hợp binomial và binary):
+      - Chia variables thành g = ceil(m / group_size) nhóm liên tiếp.
+      - Trong mỗi nhóm: AMO theo binomial, (-xi ∨ -xj) với mọi cặp.
+      - Tạo k = ceil(log2(g)) biến phụ B_0 ... B_{k-1} mã hoá chỉ số nhóm:
+        với mỗi x trong nhóm i và mỗi bit b, nếu bit b của i là 1: (-x ∨ B_b), ngược lại (-x ∨ -B_b).
+      Hai biến TRUE ở hai nhóm khác nhau buộc B nhận hai giá trị khác nhau, nên bị loại.
+      group_size phải ≥ 2 (nhóm 1 biến là binary_amo, dùng NQueensBinary), group_size ≥ m chính là binomial.
+    """
+    check_group_size(group_size)
+    m = len(variables)
+    if m < 2:
+        return next_aux_var
+    groups = [variables[i:i + group_size] for i in range(0, m, group_size)]
+
+    for group in groups:
+        for i in range(len(group)):
+            for j in range(i + 1, len(group)):
+                clauses.append([-group[i], -group[j]])
+
+    k = (len(groups) - 1).bit_length()
+    b_vars = list(range(next_aux_var, next_aux_var + k))
+    next_aux_var += k
+    for index, group in enumerate(groups):
+        for x in group:
+            for b in range(k):
+                clauses.append([-x, b_vars[b]] if (index >> b) & 1 else [-x, -b_vars[b]])
+    return next_aux_var
+
+def exactly_one_bimander(clauses, variables, next_aux_var, group_size=2):
+    at_least_one(clauses, variables)
+    return bimander_amo(clauses, variables, next_aux_var, group_size)
+
+# RETURN: Encoding dùng bimander (cùng group_size) cho hàng, cột và đường chéo
+def bimander_encoding(group_size=2):
+    check_group_size(group_size)
+
+    def exactly_one(clauses, variables, next_aux_var):
+        return exactly_one_bimander(clauses, variables, next_aux_var, group_size)
+
+    def at_most_one(clauses, variables, next_aux_var):
+        return bimander_amo(clauses, variables, next_aux_var, group_size)
+
+    return make_encoding(exactly_one, at_most_one)
+
+BIMANDER = bimander_encoding()
+
+# Hàm giải N-Queens sử dụng Bimander Encoding
+def solve_nqueens_bimander(n, group_size=2):
+    return solve_with_encoding(n, bimander_encoding(group_size))
+
+
+if __name__ == "__main__":
+    n = 8  # Thay đổi kích thước theo ý muốn
+    solution = solve_nqueens_bimander(n)
+    print_solution(solution)
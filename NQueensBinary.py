@@ -1,13 +1,7 @@
 ﻿import math
-from pysat.solvers import Glucose3
+from NQueensCore import generate_variables, at_least_one, make_encoding, generate_clauses as generate_clauses_core, solve_with_encoding, print_solution
 
 # Ký tự: ∨
-# Sinh biến cho bảng cờ N-Queens
-def generate_variables(n):
-    return [[i * n + j + 1 for j in range(n)] for i in range(n)]
-
-def at_least_one(clauses, variables):
-    clauses.append(variables)
 
 # RETURN:       - Y_vars : danh sách biến phụ tạo ra
 #               - next_aux_var_updated: next_aux_var sau khi cấp phát.
@@ -49,68 +43,24 @@ def exactly_one_binary(clauses, variables, next_aux_var):
     _, next_aux_var_updated = binary_amo(clauses, variables, next_aux_var)
     return next_aux_var_updated
 
+# Chỉ trả về next_aux_var để dùng chung chữ ký với các encoding khác.
+def at_most_one_binary(clauses, variables, next_aux_var):
+    _, next_aux_var_updated = binary_amo(clauses, variables, next_aux_var)
+    return next_aux_var_updated
+
+BINARY = make_encoding(exactly_one_binary, at_most_one_binary)
+
 # RETURN: Trả về các mệnh đề phù hợp để giả NQueens (clauses) 
 #         và ID biến tiếp theo sau khi đã cấp phát các biến phụ (next_aux_var)
 def generate_clauses(n, board):
-    clauses = []
-
-    # Các biến đã được tạo từ 1 đến n*n, do đó next_aux_var khởi đầu là n*n + 1.
-    next_aux_var = n * n + 1
-
-    # Hàng: mỗi hàng phải có chính xác 1 queen.
-    for i in range(n):
-        row_vars = board[i]
-        next_aux_var = exactly_one_binary(clauses, row_vars, next_aux_var)
-
-    # Cột: mỗi cột có Exactly one queen.
-    for j in range(n):
-        col_vars = [board[i][j] for i in range(n)]
-        next_aux_var = exactly_one_binary(clauses, col_vars, next_aux_var)
-
-    # Đường chéo chính (xuống phải) và đường chéo phụ (xuống trái).
-    for i in range(n):
-        for j in range(n):
-            diag1 = []
-            diag2 = []
-            for k in range(1, n):
-                if i + k < n and j + k < n:
-                    diag1.append(board[i+k][j+k])
-                if i + k < n and j - k >= 0:
-                    diag2.append(board[i+k][j-k])
-            if len(diag1) > 1:
-                _, next_aux_var = binary_amo(clauses, diag1, next_aux_var)
-            if len(diag2) > 1:
-                _, next_aux_var = binary_amo(clauses, diag2, next_aux_var)
-    return clauses, next_aux_var
+    return generate_clauses_core(n, board, BINARY)
 
 # Hàm giải N-Queens sử dụng Binary Encoding
 def solve_nqueens_binary(n):
-    board = generate_variables(n)  # Ma trận bàn cờ n x n
-    clauses, _ = generate_clauses(n, board)
-
-    solver = Glucose3()
-    for cl in clauses:
-        solver.add_clause(cl)
-
-    if solver.solve():
-        model = solver.get_model()
-        solution = [[0]*n for _ in range(n)]
-        for i in range(n):
-            for j in range(n):
-                var_id = board[i][j]
-                if var_id in model:
-                    solution[i][j] = 1
-        return solution
-    else:
-        return None
+    return solve_with_encoding(n, BINARY)
 
-def print_solution(solution):
-    if solution is None:
-        print("No solution found.")
-    else:
-        for row in solution:
-            print(" ".join("Q" if cell else "." for cell in row))
 
-n = 4 # Thay đổi kích thước theo ý muốn
-solution = solve_nqueens_binary(n)
-print_solution(solution)
+if __name__ == "__main__":
+    n = 4 # Thay đổi kích thước theo ý muốn
+    solution = solve_nqueens_binary(n)
+    print_solution(solution)
@@ -0,0 +1,211 @@
+﻿import argparse
+import json
+import sys
+import threading
+import time
+from collections import namedtuple
+
+from pysat.solvers import Solver
+
+from NQueensCore import load_clauses, decode_model, generate_variables, print_solution
+from NQueensConstructive import find_solution_constructive
+from NQueensLocalSearch import find_solution_local
+from NQueensNativeCard import load_native
+from NQueensSolver import ENCODINGS, get_encoding
+from NQueensStats import NO_STATS, SolveStats
+
+# Giải có giới hạn: thời gian thực (interrupt), số conflict (conf_budget) và số propagation (prop_budget),
+# qua solve_limited của pysat. Hết giới hạn thì trả về trạng thái UNKNOWN thay vì chờ mãi,
+# và có thể chuyển sang encoding / backend khác (các attempt lần lượt).
+
+SAT = "SAT"
+UNSAT = "UNSAT"
+UNKNOWN = "UNKNOWN"
+
+# time: giây cho toàn bộ lần giải (tính cả việc sinh công thức và mọi attempt); mỗi attempt được chia đều
+#       phần thời gian còn lại cho các attempt chưa chạy, việc sinh công thức bị dừng giữa chừng
+#       (load_clauses với deadline) và bước giải bị ngắt bằng interrupt khi hết phần của mình;
+# conflicts, propagations: giới hạn cho mỗi attempt. None là không giới hạn.
+Budget = namedtuple("Budget", ["time", "conflicts", "propagations"], defaults=(None, None, None))
+
+# Kết quả: status (SAT / UNSAT / UNKNOWN), Solution hoặc None, attempt cho kết quả cuối cùng
+# (backend, encoding) và usage: thời gian, conflicts, propagations đã dùng cùng chi tiết từng attempt
+BudgetResult = namedtuple("BudgetResult", ["status", "solution", "backend", "encoding", "usage"])
+
+# Các attempt mặc định: (backend, encoding), encoding chỉ dùng cho backend sat
+DEFAULT_ATTEMPTS = (("sat", "sequential"), ("sat", "product"), ("native", None))
+
+# Solver mặc định cho backend sat: Minisat kiểm tra giới hạn sau mỗi conflict, còn Glucose chỉ kiểm tra
+# khi restart (có thể rất hiếm) nên vượt giới hạn rất xa
+BUDGET_SOLVER = "minisat22"
+
+# Các backend có thể bị giới hạn (backtrack không ngắt được giữa chừng nên không có ở đây)
+BUDGET_BACKENDS = ("sat", "native", "constructive", "local")
+
+# PARAMETERS:
+#   solver: solver của pysat đã nạp công thức
+#   budget: Budget (chỉ dùng conflicts, propagations)
+#   assumptions: các literal giả thiết (Ex: hậu đặt sẵn)
+#   deadline: mốc time.perf_counter() phải dừng, None là không giới hạn thời gian
+# RETURN: True (SAT), False (UNSAT) hoặc None nếu hết giới hạn
+def solve_limited(solver, budget, assumptions=(), deadline=None):
+    if budget.conflicts is not None:
+        solver.conf_budget(budget.conflicts)
+    if budget.propagations is not None:
+        solver.prop_budget(budget.propagations)
+    if deadline is None:
+        return solver.solve_limited(assumptions=list(assumptions))
+
+    remaining = deadline - time.perf_counter()
+    if remaining <= 0:
+        return None
+    timer = threading.Timer(remaining, solver.interrupt)
+    timer.start()
+    try:
+        return solver.solve_limited(assumptions=list(assumptions), expect_interrupt=True)
+    finally:
+        timer.cancel()
+        solver.clear_interrupt()
+
+# RETURN: ID biến của các hậu đặt sẵn, kiểm tra nằm trong bàn cờ
+def placed_assumptions(n, placed):
+    board = generate_variables(n)
+    assumptions = []
+    for row, col in placed:
+        if not (0 <= row < n and 0 <= col < n):
+            raise ValueError("Queen (%d, %d) is outside the %dx%d board" % (row, col, n, n))
+        assumptions.append(board[row][col])
+    return assumptions
+
+# PARAMETERS:
+#   n: kích thước bàn cờ
+#   backend: một trong BUDGET_BACKENDS
+#   encoding, params: encoding (ENCODINGS) và tham số của nó cho backend sat
+#   budget: Budget; deadline: mốc dừng của attempt này (None nếu không giới hạn)
+#   placed: các hậu đặt sẵn (row, col)
+#   solver_name: mặc định BUDGET_SOLVER cho sat, minicard cho native
+# RETURN: (status, Solution hoặc None, usage của attempt)
+def run_attempt(n, backend, encoding=None, budget=Budget(), deadline=None, placed=(), solver_name=None,
+                stats=NO_STATS, **params):
+    start = time.perf_counter()
+    usage = {"backend": backend, "encoding": encoding, "conflicts": 0, "propagations": 0}
+
+    if backend == "constructive":
+        # Công thức dựng sẵn không nhận hậu đặt sẵn; UNKNOWN nếu lời giải không khớp với chúng
+        solution = find_solution_constructive(n)
+        if solution is None:
+            status = UNSAT if not placed else UNKNOWN
+        else:
+            status = SAT if all(solution.queens[row] == col for row, col in placed) else UNKNOWN
+        usage["time"] = time.perf_counter() - start
+        return status, solution if status == SAT else None, usage
+    if backend == "local":
+        # Tìm kiếm cục bộ dùng phần thời gian còn lại, không chứng minh được UNSAT
+        remaining = None if deadline is None else max(deadline - time.perf_counter(), 0.0)
+        solution = find_solution_local(n, placed, time_limit=remaining)
+        usage["time"] = time.perf_counter() - start
+        return SAT if solution is not None else UNKNOWN, solution, usage
+    if backend not in ("sat", "native"):
+        raise ValueError("Backend %r cannot run under a budget, expected one of: %s" % (backend, ", ".join(BUDGET_BACKENDS)))
+
+    assumptions = placed_assumptions(n, placed)
+    solution = None
+    with Solver(name=solver_name or (BUDGET_SOLVER if backend == "sat" else "minicard")) as solver:
+        try:
+            if backend == "sat":
+                load_clauses(solver, n, get_encoding(encoding or "sequential", **params), stats=stats, deadline=deadline)
+            else:
+                with stats.phase("load"):
+                    load_native(solver, n, generate_variables(n))
+        except TimeoutError:
+            # Hết thời gian khi đang sinh công thức: công thức chưa đầy đủ, không giải
+            usage.update(time=time.perf_counter() - start, encode_timeout=True)
+            return UNKNOWN, None, usage
+
+        with stats.phase("solve"):
+            sat = solve_limited(solver, budget, assumptions, deadline)
+        if sat:
+            with stats.phase("decode"):
+                solution = decode_model(solver.get_model(), n)
+        solver_stats = solver.accum_stats() or {}
+
+    usage.update(conflicts=solver_stats.get("conflicts", 0), propagations=solver_stats.get("propagations", 0),
+                 time=time.perf_counter() - start)
+    return (UNKNOWN if sat is None else SAT if sat else UNSAT), solution, usage
+
+# PARAMETERS:
+#   n: kích thước bàn cờ
+#   budget: Budget
+#   attempts: danh sách (backend, encoding) thử lần lượt, attempt sau chỉ chạy khi attempt trước UNKNOWN;
+#             khi có budget.time, mỗi attempt được dùng (thời gian còn lại) / (số attempt chưa chạy),
+#             attempt xong sớm thì phần thừa dồn cho các attempt sau
+#   placed: các hậu đặt sẵn (row, col)
+#   params: tham số riêng cho từng encoding, Ex: {"commander": {"group_size": 4}}
+#   stats: SolveStats (NQueensStats) tuỳ chọn, cộng dồn các pha của mọi attempt
+# RETURN: BudgetResult
+def solve_budgeted(n, budget=Budget(), attempts=DEFAULT_ATTEMPTS, placed=(), solver_name=None, params=None, stats=None):
+    stats = stats or NO_STATS
+    stats.record(n=n, budget=budget._asdict())
+    start = time.perf_counter()
+    deadline = None if budget.time is None else start + budget.time
+    usage = {"time": 0.0, "conflicts": 0, "propagations": 0, "attempts": []}
+    status, solution, backend, encoding = UNKNOWN, None, None, None
+
+    attempts = list(attempts)
+    for index, (attempt_backend, attempt_encoding) in enumerate(attempts):
+        attempt_deadline = None
+        if deadline is not None:
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+            attempt_deadline = now + (deadline - now) / (len(attempts) - index)
+        backend, encoding = attempt_backend, attempt_encoding
+        status, solution, attempt_usage = run_attempt(n, backend, encoding, budget, attempt_deadline, placed,
+                                                      solver_name, stats, **(params or {}).get(encoding, {}))
+        attempt_usage["status"] = status
+        usage["attempts"].append(attempt_usage)
+        usage["conflicts"] += attempt_usage["conflicts"]
+        usage["propagations"] += attempt_usage["propagations"]
+        if status != UNKNOWN:
+            break
+
+    usage["time"] = time.perf_counter() - start
+    stats.record(backend=backend, encoding=encoding, attempts=len(usage["attempts"]))
+    stats.finish(solution, status)
+    return BudgetResult(status, solution, backend, encoding, usage)
+
+# "sat:product", "product" (tức sat:product), "native", "constructive" -> (backend, encoding)
+def attempt_arg(value):
+    backend, _, encoding = value.partition(":")
+    if backend in BUDGET_BACKENDS:
+        return backend, encoding or None
+    if backend in ENCODINGS and not encoding:
+        return "sat", backend
+    raise argparse.ArgumentTypeError("expected backend[:encoding] with backend in %s, or an encoding name" % (", ".join(BUDGET_BACKENDS),))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Giải N-Queens với giới hạn thời gian / conflict / propagation.")
+    parser.add_argument("n", type=int, help="kích thước bàn cờ")
+    parser.add_argument("--time", type=float, help="giới hạn thời gian (giây) cho toàn bộ lần giải")
+    parser.add_argument("--conflicts", type=int, help="giới hạn số conflict mỗi attempt")
+    parser.add_argument("--propagations", type=int, help="giới hạn số propagation mỗi attempt")
+    parser.add_argument("--attempts", nargs="+", type=attempt_arg, default=list(DEFAULT_ATTEMPTS),
+                        help="các attempt thử lần lượt khi UNKNOWN, Ex: sequential sat:product native constructive")
+    parser.add_argument("--place", nargs=2, type=int, action="append", default=[], metavar=("ROW", "COL"),
+                        help="hậu đặt sẵn (có thể lặp lại)")
+    parser.add_argument("--solver", help="solver của pysat")
+    parser.add_argument("--stats", action="store_true", help="ghi thống kê từng pha (JSON lines) ra stderr")
+    args = parser.parse_args(argv)
+
+    budget = Budget(args.time, args.conflicts, args.propagations)
+    stats = SolveStats(out=sys.stderr) if args.stats else None
+    result = solve_budgeted(args.n, budget, args.attempts, [tuple(p) for p in args.place], args.solver, stats=stats)
+    print("Status: %s (%s%s)" % (result.status, result.backend, ":" + result.encoding if result.encoding else ""))
+    print("Usage: %s" % (json.dumps(result.usage),))
+    if result.status != UNKNOWN:
+        print_solution(result.solution)
+    return 0 if result.status != UNKNOWN else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
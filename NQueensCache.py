@@ -0,0 +1,155 @@
+﻿import hashlib
+import json
+import os
+import struct
+import tempfile
+
+import numpy as np
+from pysat.solvers import Solver
+
+from NQueensCore import generate_variables, generate_clauses, decode_model
+from NQueensStats import NO_STATS
+from NQueensSolver import get_encoding
+
+# Bộ nhớ đệm công thức CNF trên đĩa: với cùng (encoding, n, tham số), generate_clauses luôn sinh ra
+# cùng một công thức, nên lần đầu công thức được ghi ra file nhị phân, các lần sau nạp thẳng từ file
+# qua mmap mà không cần sinh mệnh đề bằng Python.
+#
+# Định dạng file (little-endian):
+#   header: magic "NQCF", version (uint32), nv, số clause, số phần tử literal (int64)
+#   data:   các literal int32 nối tiếp nhau, mỗi clause kết thúc bằng 0 (như DIMACS)
+
+MAGIC = b"NQCF"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sIqqq")
+SUFFIX = ".nqcf"
+
+# Tăng giá trị này khi thay đổi cách một encoding sinh mệnh đề, để bỏ qua các file cũ trong cache
+#   2: commander thêm AMO trong mỗi nhóm, NSC dùng một clause ALO cho k = 1
+ENCODER_VERSION = 2
+
+# Số clause nạp vào solver mỗi lần khi đọc từ file
+LOAD_BATCH = 1 << 16
+
+# RETURN: mảng int32 phẳng kết thúc mỗi clause bằng 0, dựng từ Formula
+def formula_to_flat(formula):
+    literals = np.frombuffer(formula.buffer(), dtype=np.int32)
+    offsets = np.frombuffer(formula.offsets, dtype=np.int64)
+    return np.insert(literals, offsets[1:], 0).astype("<i4", copy=False)
+
+# Nạp mảng phẳng vào solver theo từng lô LOAD_BATCH clause
+def load_flat(solver, flat):
+    ends = np.flatnonzero(flat == 0)
+    for first in range(0, len(ends), LOAD_BATCH):
+        last = min(first + LOAD_BATCH, len(ends))
+        lo = int(ends[first - 1]) + 1 if first else 0
+        hi = int(ends[last - 1]) + 1
+        chunk = flat[lo:hi].tolist()
+        clauses = []
+        start = 0
+        for end in (ends[first:last] - lo).tolist():
+            clauses.append(chunk[start:end])
+            start = end + 1
+        solver.append_formula(clauses)
+
+class FormulaCache:
+    """
+    Cache theo nội dung (content-addressed): tên file là SHA-256 của (encoding, n, tham số, phiên bản).
+    Khi tổng dung lượng vượt max_bytes, các file ít được dùng gần đây nhất (theo mtime) bị xoá.
+    """
+
+    def __init__(self, directory, max_bytes=1 << 30):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, encoding, n, params=None):
+        payload = json.dumps({"encoding": encoding, "n": n, "params": params or {},
+                              "format": FORMAT_VERSION, "encoder": ENCODER_VERSION}, sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key + SUFFIX)
+
+    # RETURN: (flat, nv, số clause) với flat là np.memmap chỉ đọc, hoặc None nếu chưa có trong cache
+    def get(self, encoding, n, params=None):
+        path = self.path(self.key(encoding, n, params))
+        try:
+            with open(path, "rb") as f:
+                magic, version, nv, num_clauses, num_literals = HEADER.unpack(f.read(HEADER.size))
+        except (FileNotFoundError, struct.error):
+            return None
+        if magic != MAGIC or version != FORMAT_VERSION:
+            return None
+        os.utime(path)      # đánh dấu vừa được dùng cho LRU
+        if num_literals == 0:
+            return np.zeros(0, dtype="<i4"), nv, num_clauses
+        flat = np.memmap(path, dtype="<i4", mode="r", offset=HEADER.size, shape=(num_literals,))
+        return flat, nv, num_clauses
+
+    # Ghi Formula vào cache (ghi ra file tạm rồi đổi tên để không bao giờ đọc phải file dở dang)
+    def put(self, encoding, n, params, formula):
+        path = self.path(self.key(encoding, n, params))
+        flat = formula_to_flat(formula)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(HEADER.pack(MAGIC, FORMAT_VERSION, formula.nv, len(formula), len(flat)))
+                f.write(flat.tobytes())
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        self.evict(keep=path)
+        return path
+
+    # Xoá các file cũ nhất cho tới khi tổng dung lượng ≤ max_bytes (không xoá file keep)
+    def evict(self, keep=None):
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(SUFFIX):
+                path = os.path.join(self.directory, name)
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path != keep:
+                os.unlink(path)
+                total -= size
+
+    # PARAMETERS:
+    #   solver: solver của pysat
+    #   n, encoding, params: như NQueensSolver.get_encoding
+    # RETURN: (board, next_aux_var) giống NQueensCore.load_clauses
+    def load_clauses(self, solver, n, encoding="sequential", params=None):
+        board = generate_variables(n)
+        cached = self.get(encoding, n, params)
+        if cached is None:
+            formula, _ = generate_clauses(n, board, get_encoding(encoding, **(params or {})))
+            self.put(encoding, n, params, formula)
+            cached = self.get(encoding, n, params)
+        flat, nv, _ = cached
+        load_flat(solver, flat)
+        return board, nv + 1
+
+# Hàm giải N-Queens dùng công thức từ cache
+#   stats: SolveStats (NQueensStats) tuỳ chọn; pha "load" gồm cả việc sinh và ghi công thức khi cache chưa có
+# RETURN: Solution nếu SATISFIABLE, ngược lại None
+def find_solution_cached(n, cache, encoding="sequential", solver_name="glucose3", stats=None, **params):
+    stats = stats or NO_STATS
+    stats.record(n=n, backend="sat", encoding=encoding, solver=solver_name, cached=True)
+    solution = None
+    with Solver(name=solver_name) as solver:
+        with stats.phase("load"):
+            _, next_aux_var = cache.load_clauses(solver, n, encoding, params)
+        stats.count(variables=next_aux_var - 1, aux_vars=next_aux_var - 1 - n * n)
+        with stats.phase("solve"):
+            sat = solver.solve()
+        if sat:
+            with stats.phase("decode"):
+                solution = decode_model(solver.get_model(), n)
+        stats.solver_stats(solver)
+    stats.finish(solution)
+    return solution
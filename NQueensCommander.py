@@ -1,12 +1,8 @@
-﻿from pysat.solvers import Glucose3
+﻿from functools import lru_cache
 
-# Ký tự: ∨
-# Sinh biến cho bảng cờ N-Queens
-def generate_variables(n):
-    return [[i * n + j + 1 for j in range(n)] for i in range(n)]
+from NQueensCore import generate_variables, at_least_one, Encoding, generate_clauses as generate_clauses_core, solve_with_encoding, print_solution
 
-def at_least_one(clauses, variables):
-    clauses.append(variables)
+# Ký tự: ∨
 
 # Mã hoá AMO theo binomial
 def at_most_one_binomial(clauses, variables):
@@ -18,8 +14,8 @@ def exactly_one_binomial(clauses, variables):
     at_least_one(clauses, variables)
     at_most_one_binomial(clauses, variables)
 
-# RETURN: trả về next_var_updated sau khi đã cấp phát các biến chỉ huy.
-def commander_exactly_one(clauses, variables, group_size, next_aux_var):
+# RETURN: (commander_vars, next_aux_var) sau khi đã cấp phát các biến chỉ huy.
+def commander_groups(clauses, variables, group_size, next_aux_var):
     """
     Các bước:
       1. Chia tập biến 'variables' thành các nhóm (group) có kích thước 'group_size'
@@ -27,10 +23,10 @@ def commander_exactly_one(clauses, variables, group_size, next_aux_var):
       2. Với mỗi nhóm, giới thiệu một biến chỉ huy (commander variable) có ID bắt đầu từ next_aux_var.
       3. Cho mỗi biến x trong một nhóm, thêm clause: (¬x ∨ c)  => nếu x được chọn thì commander c phải đúng.
       4. Thêm clause: (x1 ∨ x2 ∨ ... ∨ x_k ∨ ¬c) cho nhóm đó, đảm bảo nếu c không đúng thì không có x nào được chọn.
-      5. Sau đó, trên tập các biến chỉ huy vừa tạo ra, thêm ràng buộc "exactly one" (ở đây dùng binomial):
-            - ALO: (c1 ∨ c2 ∨ ... ∨ c_m)
-            - AMO: với mọi cặp (ci, cj), thêm (¬ci ∨ ¬cj)
+      5. Trong mỗi nhóm, thêm AMO theo binomial: với mọi cặp (xi, xj) cùng nhóm, thêm (¬xi ∨ ¬xj).
+    group_size phải ≥ 2 (check_commander).
     """
+    check_commander(group_size)
     # Chia các biến thành các nhóm
     # groups là một danh sách các sublist, mỗi sublist chứa một nhóm các biến. 
     # Ví dụ, nếu variables = [1,2,3,4,5,6,7,8,9,10] và group_size = 3, thì kết quả sẽ là
@@ -47,81 +43,123 @@ def commander_exactly_one(clauses, variables, group_size, next_aux_var):
             clauses.append([-x, commander])
         # Nếu commander không đúng thì phải có ít nhất một x đúng trong nhóm.
         # Clause: (x1 ∨ x2 ∨ ... ∨ x_k ∨ ¬commander)
-        group_clause = group[:]  # sao chép danh sách biến của nhóm
+        group_clause = list(group)  # sao chép danh sách biến của nhóm (variables có thể là tuple)
         group_clause.append(-commander)
         clauses.append(group_clause)
-    
-    # Ràng buộc "exactly one" trên các biến chỉ huy
+        # Trong một nhóm có tối đa một biến đúng
+        at_most_one_binomial(clauses, group)
+
+    return commander_vars, next_aux_var
+
+# RETURN: trả về next_var_updated sau khi đã cấp phát các biến chỉ huy.
+def commander_at_most_one(clauses, variables, group_size, next_aux_var):
+    commander_vars, next_aux_var = commander_groups(clauses, variables, group_size, next_aux_var)
+    # Ràng buộc "at most one" trên các biến chỉ huy
+    at_most_one_binomial(clauses, commander_vars)
+    return next_aux_var
+
+# RETURN: trả về next_var_updated sau khi đã cấp phát các biến chỉ huy.
+def commander_exactly_one(clauses, variables, group_size, next_aux_var):
+    commander_vars, next_aux_var = commander_groups(clauses, variables, group_size, next_aux_var)
+    # Ràng buộc "exactly one" trên các biến chỉ huy (ở đây dùng binomial):
+    #   - ALO: (c1 ∨ c2 ∨ ... ∨ c_m)
+    #   - AMO: với mọi cặp (ci, cj), thêm (¬ci ∨ ¬cj)
     at_least_one(clauses, commander_vars)
     at_most_one_binomial(clauses, commander_vars)
-    
     return next_aux_var
 
+# Kiểm tra tham số của commander (một hoặc nhiều tầng), group_size = "auto" luôn hợp lệ
+def check_commander(group_size, depth=None):
+    if group_size != "auto" and (not isinstance(group_size, int) or group_size < 2):
+        raise ValueError("Commander group_size must be an integer >= 2 or 'auto', got %r" % (group_size,))
+    if depth is not None and depth < 0:
+        raise ValueError("Commander depth must be None or >= 0, got %r" % (depth,))
+
+# PARAMETERS:
+#   clauses, variables, group_size, next_aux_var: như commander_at_most_one
+#   depth: số tầng commander tối đa, None là không giới hạn
+# RETURN: trả về next_aux_var sau khi đã cấp phát các biến chỉ huy.
+def recursive_commander_at_most_one(clauses, variables, group_size, next_aux_var, depth=None):
+    """
+    Commander nhiều tầng: thay vì binomial trên các biến chỉ huy (O(k^2) mệnh đề với k = m / group_size),
+    các biến chỉ huy lại được chia nhóm và có biến chỉ huy riêng, cho tới khi còn không quá group_size biến
+    hoặc đã dùng hết depth tầng; tầng cuối cùng dùng binomial.
+    group_size phải ≥ 2 (nhóm 1 biến không làm giảm số biến, vòng lặp không dừng), depth là None hoặc ≥ 0.
+    """
+    check_commander(group_size, depth)
+    while len(variables) > group_size and depth != 0:
+        variables, next_aux_var = commander_groups(clauses, variables, group_size, next_aux_var)
+        depth = None if depth is None else depth - 1
+    at_most_one_binomial(clauses, variables)
+    return next_aux_var
+
+def recursive_commander_exactly_one(clauses, variables, group_size, next_aux_var, depth=None):
+    at_least_one(clauses, variables)
+    return recursive_commander_at_most_one(clauses, variables, group_size, next_aux_var, depth)
+
+# RETURN: Encoding dùng commander nhiều tầng cho hàng, cột và đường chéo
+def recursive_commander_encoding(group_size=3, depth=None):
+    check_commander(group_size, depth)
+
+    def size(variables):
+        return best_group_size(len(variables)) if group_size == "auto" else group_size
+
+    def exactly_one(clauses, variables, next_aux_var):
+        return recursive_commander_exactly_one(clauses, variables, size(variables), next_aux_var, depth)
+
+    def at_most_one(clauses, variables, next_aux_var):
+        return recursive_commander_at_most_one(clauses, variables, size(variables), next_aux_var, depth)
+
+    return Encoding(exactly_one, exactly_one, at_most_one)
+
+# Số mệnh đề và số biến phụ của commander_at_most_one trên m biến với nhóm kích thước g
+def commander_cost(m, g):
+    k = -(-m // g)      # số nhóm = ceil(m / g)
+    clauses = k * (k - 1) // 2
+    for start in range(0, m, g):
+        s = min(g, m - start)
+        clauses += s + 1 + s * (s - 1) // 2
+    return clauses, k
+
+# RETURN: group_size cho commander trên m biến với ít mệnh đề nhất (hoà thì ít biến phụ hơn)
+@lru_cache(maxsize=None)
+def best_group_size(m):
+    if m <= 2:
+        return 2
+    return min(range(2, m + 1), key=lambda g: commander_cost(m, g))
+
+# Binomial không cần biến phụ, next_aux_var được giữ nguyên.
+def at_most_one_binomial_aux(clauses, variables, next_aux_var):
+    at_most_one_binomial(clauses, variables)
+    return next_aux_var
+
+def exactly_one_binomial_aux(clauses, variables, next_aux_var):
+    exactly_one_binomial(clauses, variables)
+    return next_aux_var
+
+# RETURN: Encoding dùng commander cho hàng, binomial cho cột và đường chéo.
+#         group_size = "auto" chọn kích thước nhóm theo best_group_size cho từng hàng.
+def commander_encoding(group_size=3):
+    check_commander(group_size)
+
+    def rows(clauses, variables, next_aux_var):
+        g = best_group_size(len(variables)) if group_size == "auto" else group_size
+        return commander_exactly_one(clauses, variables, g, next_aux_var)
+    return Encoding(rows, exactly_one_binomial_aux, at_most_one_binomial_aux)
+
 # RETURN: Trả về các mệnh đề phù hợp để giả NQueens (clauses) 
 def generate_clauses(n, board, group_size=3):
-    clauses = []
-
-    # Các biến đã được tạo từ 1 đến n*n, do đó next_aux_var khởi đầu là n*n + 1.
-    next_aux_var = n * n + 1 
-
-    # Hàng: mỗi hàng phải có chính xác 1 queen.
-    for i in range(n):
-        row_vars = board[i]
-        next_aux_var = commander_exactly_one(clauses, row_vars, group_size, next_aux_var)
-
-    # Cột: mỗi cột có Exactly one queen.
-    for j in range(n):
-        col_vars = [board[i][j] for i in range(n)]
-        exactly_one_binomial(clauses, col_vars)
-    
-    # Đường chéo chính (xuống phải) và đường chéo phụ (xuống trái).
-    for i in range(n):
-        for j in range(n):
-            diag1 = []
-            diag2 = []
-            for k in range(1, n):
-                if i + k < n and j + k < n:
-                    diag1.append(board[i+k][j+k])
-                if i + k < n and j - k >= 0:
-                    diag2.append(board[i+k][j-k])
-            if len(diag1) > 1:
-                at_most_one_binomial(clauses, diag1)
-            if len(diag2) > 1:
-                at_most_one_binomial(clauses, diag2)
-
+    clauses, _ = generate_clauses_core(n, board, commander_encoding(group_size))
     return clauses
 
 # Hàm giải N-Queens sử dụng Commander Encoding
 def solve_nqueens(n, group_size=3):
-    board = generate_variables(n)
-    clauses = generate_clauses(n, board, group_size)
-
-    solver = Glucose3()
-    for cl in clauses:
-        solver.add_clause(cl)
-    
-    if solver.solve():
-        model = solver.get_model()
-        solution = [[0]*n for _ in range(n)]
-        for i in range(n):
-            for j in range(n):
-                var = board[i][j]
-                if var in model:
-                    solution[i][j] = 1
-        return solution
-    else:
-        return None
-
-def print_solution(solution):
-    if solution is None:
-        print("No solution found.")
-    else:
-        for row in solution:
-            print(" ".join("Q" if cell else "." for cell in row))
+    return solve_with_encoding(n, commander_encoding(group_size))
 
+
+if __name__ == "__main__":
     n = 4   # Thay đổi kích thước theo ý muốn
     # group_size xác định kích thước nhóm dùng trong commander encoding cho mỗi hàng.
     # Ví dụ, nếu group_size = 2, mỗi hàng sẽ được chia thành các nhóm có 2 biến (ngoại lệ nhóm cuối có thể nhỏ hơn).
     solution = solve_nqueens(n, group_size=2)
     print_solution(solution)
-
@@ -0,0 +1,48 @@
+﻿from NQueensCore import Solution, print_solution
+from NQueensStats import NO_STATS
+
+# Dựng trực tiếp một lời giải theo công thức tường minh phụ thuộc n mod 6,
+# thời gian và bộ nhớ O(n), không cần ma trận n x n biến như các encoding SAT.
+
+# RETURN: list queens (queens[i] = cột của hậu ở hàng i, đánh số từ 0), hoặc None nếu n = 2, 3
+def construct_queens(n):
+    """
+    Các bước (cột đánh số từ 1):
+      - evens = [2, 4, ...], odds = [1, 3, 5, ...] với các số ≤ n.
+      - Nếu n mod 6 = 2: đổi chỗ 1 và 3 trong odds, chuyển 5 xuống cuối odds.
+      - Nếu n mod 6 = 3: chuyển 2 xuống cuối evens, chuyển 1 rồi 3 xuống cuối odds.
+      - Ghép evens + odds, phần tử thứ i là cột của hậu ở hàng i.
+    """
+    if n == 1:
+        return [0]
+    if n in (2, 3):
+        return None
+
+    evens = list(range(2, n + 1, 2))
+    odds = list(range(1, n + 1, 2))
+    if n % 6 == 2:
+        odds[0], odds[1] = odds[1], odds[0]
+        odds.remove(5)
+        odds.append(5)
+    elif n % 6 == 3:
+        evens.remove(2)
+        evens.append(2)
+        odds.remove(1)
+        odds.remove(3)
+        odds.extend([1, 3])
+    return [col - 1 for col in evens + odds]
+
+# RETURN: Solution dựng theo công thức, hoặc None nếu bàn cờ không có lời giải (n = 2, 3)
+def find_solution_constructive(n, stats=None):
+    stats = stats or NO_STATS
+    stats.record(n=n, backend="constructive")
+    with stats.phase("construct"):
+        queens = construct_queens(n)
+    solution = Solution(queens) if queens is not None else None
+    stats.finish(solution)
+    return solution
+
+
+if __name__ == "__main__":
+    n = 8  # Thay đổi kích thước theo ý muốn
+    print_solution(find_solution_constructive(n))
@@ -0,0 +1,439 @@
+﻿import time
+from array import array
+from collections import OrderedDict, namedtuple
+from pysat.solvers import Solver
+
+from NQueensStats import NO_STATS
+
+try:
+    import numpy as np
+except ImportError:     # numpy là tuỳ chọn, chỉ dùng cho model và công thức dạng mảng
+    np = None
+
+# Ký tự: ∨
+# Phần lõi dùng chung cho mọi encoding: sinh biến, duyệt hàng/cột/đường chéo,
+# nạp mệnh đề vào solver và giải mã model. Mỗi encoding chỉ cần cung cấp các hàm ràng buộc.
+
+# Tổng số ô (n^2 cộng dồn) tối đa của các bàn cờ giữ trong cache của board_index;
+# bàn cờ vừa dùng luôn được giữ dù lớn hơn giới hạn
+BOARD_CACHE_CELLS = 1 << 21
+
+# Chỉ mục hình học của bàn cờ n x n, biến của ô (i, j) là i * n + j + 1 (đánh số theo hàng).
+# Mọi đường (hàng, cột, đường chéo) là tuple ID biến, không đổi nên được dùng chung giữa các lần giải.
+# Các đường được cắt (slice) từ một tuple phẳng chứa mọi biến, nên các đối tượng int được dùng chung
+# và việc dựng chạy trong C. Chỉ rows được dựng ngay; cột và đường chéo dựng khi được dùng lần đầu
+# (generate_variables, decode, hậu đặt sẵn không cần đến chúng).
+class BoardIndex:
+    """
+    Các trường:
+      - rows[i], cols[j]: biến của hàng i, cột j
+      - diags: đường chéo chính (i - j = d, d từ -(n-2) đến n-2), chỉ các đường có ít nhất 2 ô
+      - anti_diags: đường chéo phụ (i + j = s, s từ 1 đến 2n-3), chỉ các đường có ít nhất 2 ô
+      - lines: rows + cols + diags + anti_diags
+    """
+    __slots__ = ("n", "rows", "_cells", "_cols", "_diags", "_anti_diags", "_cell_lines")
+
+    def __init__(self, n):
+        self.n = n
+        self._cells = cells = tuple(range(1, n * n + 1))     # cells[k] là biến của ô (k // n, k % n)
+        self.rows = tuple(cells[i * n:(i + 1) * n] for i in range(n))
+        self._cols = self._diags = self._anti_diags = self._cell_lines = None
+
+    @property
+    def cols(self):
+        if self._cols is None:
+            n, cells = self.n, self._cells
+            self._cols = tuple(cells[j::n] for j in range(n))
+        return self._cols
+
+    @property
+    def diags(self):
+        if self._diags is None:
+            # Ô (i, i - d) cách nhau n + 1 ô trên đường chéo chính
+            n, cells = self.n, self._cells
+            self._diags = tuple(cells[max(d, 0) * (n + 1) - d:(min(n, n + d) - 1) * (n + 1) - d + 1:n + 1]
+                                for d in range(-(n - 2), n - 1))
+        return self._diags
+
+    @property
+    def anti_diags(self):
+        if self._anti_diags is None:
+            # Ô (i, s - i) cách nhau n - 1 ô trên đường chéo phụ
+            n, cells = self.n, self._cells
+            self._anti_diags = tuple(cells[max(0, s - n + 1) * (n - 1) + s:(min(n, s + 1) - 1) * (n - 1) + s + 1:n - 1]
+                                     for s in range(1, 2 * n - 2))
+        return self._anti_diags
+
+    @property
+    def lines(self):
+        return self.rows + self.cols + self.diags + self.anti_diags
+
+    # RETURN: mọi đường chéo (chính rồi phụ) có ít nhất 2 ô
+    def diagonals(self):
+        return self.diags + self.anti_diags
+
+    # RETURN: tuple, phần tử v - 1 là chỉ số trong lines của các đường đi qua ô có biến v
+    #         (hàng, cột, rồi các đường chéo nếu có); chỉ dựng khi được gọi lần đầu vì tốn n^2 tuple
+    def cell_lines(self):
+        if self._cell_lines is None:
+            cell_lines = [[] for _ in range(self.n * self.n)]
+            for t, line in enumerate(self.lines):
+                for v in line:
+                    cell_lines[v - 1].append(t)
+            self._cell_lines = tuple(map(tuple, cell_lines))
+        return self._cell_lines
+
+    def __repr__(self):
+        return "BoardIndex(%d)" % (self.n,)
+
+_board_cache = OrderedDict()
+
+# RETURN: BoardIndex của bàn cờ n x n, dựng một lần rồi giữ trong cache LRU
+#         (bỏ các bàn cờ ít dùng nhất khi tổng số ô vượt BOARD_CACHE_CELLS)
+def board_index(n):
+    index = _board_cache.pop(n, None)
+    if index is None:
+        index = BoardIndex(n)
+    _board_cache[n] = index
+    cells = sum(k * k for k in _board_cache)
+    while cells > BOARD_CACHE_CELLS and len(_board_cache) > 1:
+        k, _ = _board_cache.popitem(last=False)
+        cells -= k * k
+    return index
+
+# Trả về ma trận n x n , EX: n = 3 ->  (1, 2, 3),
+#                                       (4, 5, 6),
+#                                       (7, 8, 9)
+# Ma trận là tuple các hàng (tuple), dùng chung qua board_index nên không được sửa
+def generate_variables(n):
+    return board_index(n).rows
+
+def at_least_one(clauses, variables):
+    clauses.append(variables)
+
+# Công thức CNF gọn: toàn bộ literal nằm trong một array('i') liên tục, clause thứ t là
+# literals[offsets[t]:offsets[t+1]]. Mỗi literal chỉ tốn 4 byte thay vì một list Python
+# riêng cho mỗi clause. Formula có append/len/iter như list nên mọi encoder dùng được trực tiếp.
+class Formula:
+    __slots__ = ("literals", "offsets", "_nv")
+
+    def __init__(self, clauses=(), nv=None):
+        self.literals = array("i")
+        self.offsets = array("q", [0])
+        self._nv = nv
+        for clause in clauses:
+            self.append(clause)
+
+    # PARAMETERS:
+    #   flat: dãy literal nối tiếp nhau, mỗi clause kết thúc bằng 0 (Ex: NQueensVectorized.flatten)
+    #   nv: số biến của công thức, nếu None sẽ tính từ literal lớn nhất
+    @classmethod
+    def from_flat(cls, flat, nv=None):
+        formula = cls(nv=nv)
+        if np is not None:
+            flat = np.asarray(flat, dtype=np.int32)
+            ends = np.flatnonzero(flat == 0)
+            formula.literals = array("i", flat[flat != 0].tobytes())
+            formula.offsets = array("q", [0])
+            formula.offsets.extend((ends - np.arange(len(ends))).tolist())
+            return formula
+        clause = []
+        for lit in flat:
+            if lit == 0:
+                formula.append(clause)
+                clause = []
+            else:
+                clause.append(lit)
+        return formula
+
+    def append(self, clause):
+        self.literals.extend(clause)
+        self.offsets.append(len(self.literals))
+
+    def extend(self, clauses):
+        for clause in clauses:
+            self.append(clause)
+
+    # Số biến lớn nhất xuất hiện (hoặc giá trị đã gán), tương đương nv của pysat
+    @property
+    def nv(self):
+        if self._nv is not None:
+            return self._nv
+        if not self.literals:
+            return 0
+        return max(max(self.literals), -min(self.literals))
+
+    @nv.setter
+    def nv(self, value):
+        self._nv = value
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, t):
+        return self.literals[self.offsets[t]:self.offsets[t + 1]].tolist()
+
+    def __iter__(self):
+        literals, offsets = self.literals, self.offsets
+        for t in range(len(offsets) - 1):
+            yield literals[offsets[t]:offsets[t + 1]].tolist()
+
+    # Bộ nhớ đệm của literal, dùng được trực tiếp với np.frombuffer hoặc ghi ra file mà không sao chép
+    def buffer(self):
+        return memoryview(self.literals)
+
+    # Nạp công thức vào solver pysat, từng clause được cắt ra từ mảng phẳng khi cần
+    def to_solver(self, solver):
+        solver.append_formula(self)
+
+    def to_cnf(self):
+        from pysat.formula import CNF
+        return CNF(from_clauses=self)
+
+# Một encoding gồm 3 hàm ràng buộc có cùng chữ ký:
+#       f(clauses, variables, next_aux_var) -> next_aux_var
+#   - rows : Exactly one cho mỗi hàng
+#   - cols : Exactly one cho mỗi cột
+#   - diags: At most one cho mỗi đường chéo
+Encoding = namedtuple("Encoding", ["rows", "cols", "diags"])
+
+# PARAMETERS:
+#   exactly_one: hàm EO dùng cho hàng và cột
+#   at_most_one: hàm AMO dùng cho đường chéo
+# RETURN: Encoding dùng cùng một kiểu mã hoá cho hàng, cột và đường chéo
+def make_encoding(exactly_one, at_most_one):
+    return Encoding(exactly_one, exactly_one, at_most_one)
+
+# PARAMETERS:
+#   n: kích thước bàn cờ
+#   board: ma trận biến n x n (generate_variables)
+# RETURN: lần lượt từng đường chéo đầy đủ có ít nhất 2 ô, mỗi đường chéo đúng một lần.
+#         Có 2n - 3 đường chéo chính (xuống phải) và 2n - 3 đường chéo phụ (xuống trái) như vậy.
+def diagonals(n, board):
+    if board is board_index(n).rows:
+        yield from board_index(n).diagonals()
+        return
+    # Đường chéo chính: i - j = d không đổi, d từ -(n-2) đến n-2.
+    for d in range(-(n - 2), n - 1):
+        yield [board[i][i - d] for i in range(max(d, 0), min(n, n + d))]
+    # Đường chéo phụ: i + j = s không đổi, s từ 1 đến 2n-3.
+    for s in range(1, 2 * n - 2):
+        yield [board[i][s - i] for i in range(max(0, s - n + 1), min(n, s + 1))]
+
+# PARAMETERS:
+#   n: số lượng hậu
+#   board: ma trận biến n x n (generate_variables)
+#   encoding: Encoding quyết định cách mã hoá từng ràng buộc
+#   clauses: nơi nhận mệnh đề (bất kỳ đối tượng nào có append, Ex: SolverSink); mặc định là Formula mới
+#   stages: các bước mã hoá thêm chạy sau hàng/cột/đường chéo, mỗi bước là hàm
+#           f(clauses, n, board, next_aux_var) -> next_aux_var (Ex: NQueensSymmetry.symmetry_breaking)
+# RETURN: Trả về các mệnh đề phù hợp để giải NQueens (clauses)
+#         và ID biến tiếp theo sau khi đã cấp phát các biến phụ (next_aux_var)
+def generate_clauses(n, board, encoding, clauses=None, stages=()):
+    if clauses is None:
+        clauses = Formula()
+
+    # Các biến đã được tạo từ 1 đến n*n, do đó next_aux_var khởi đầu là n*n + 1.
+    next_aux_var = n * n + 1
+
+    # Bàn cờ chuẩn (generate_variables) lấy các đường có sẵn từ board_index, không dựng lại
+    index = board_index(n)
+    if board is index.rows:
+        cols, diags = index.cols, index.diagonals()
+    else:
+        cols = [[board[i][j] for i in range(n)] for j in range(n)]
+        diags = diagonals(n, board)
+
+    # Hàng: mỗi hàng phải có chính xác 1 queen.
+    for row_vars in board:
+        next_aux_var = encoding.rows(clauses, row_vars, next_aux_var)
+
+    # Cột: mỗi cột có Exactly one queen.
+    for col_vars in cols:
+        next_aux_var = encoding.cols(clauses, col_vars, next_aux_var)
+
+    # Đường chéo chính (xuống phải) và đường chéo phụ (xuống trái): mỗi đường chéo chỉ mã hoá một lần.
+    for diag in diags:
+        next_aux_var = encoding.diags(clauses, diag, next_aux_var)
+
+    for stage in stages:
+        next_aux_var = stage(clauses, n, board, next_aux_var)
+
+    if isinstance(clauses, Formula):
+        clauses.nv = next_aux_var - 1
+    return clauses, next_aux_var
+
+# Nơi nhận mệnh đề thay cho list: các encoder chỉ gọi clauses.append(...), nên SolverSink
+# gom mệnh đề thành từng lô nhỏ và nạp thẳng vào solver bằng append_formula.
+# Bộ nhớ Python chỉ giữ tối đa batch_size mệnh đề thay vì toàn bộ công thức.
+# Thời gian append_formula được tính vào pha "load" của stats (NQueensStats).
+class SolverSink:
+    __slots__ = ("solver", "batch_size", "buffer", "count", "stats")
+
+    def __init__(self, solver, batch_size=65536, stats=NO_STATS):
+        self.solver = solver
+        self.batch_size = batch_size
+        self.buffer = []
+        self.count = 0      # tổng số mệnh đề đã nhận
+        self.stats = stats
+
+    def append(self, clause):
+        self.buffer.append(clause)
+        self.count += 1
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.buffer:
+            with self.stats.phase("load"):
+                self.solver.append_formula(self.buffer)
+            self.buffer = []
+
+    def __len__(self):
+        return self.count
+
+# SolverSink có hạn chót: sau mỗi lần nạp một lô mệnh đề, nếu đã quá deadline (mốc time.perf_counter())
+# thì dừng việc sinh công thức bằng TimeoutError, solver chỉ còn một phần công thức và không nên dùng tiếp.
+class DeadlineSink(SolverSink):
+    __slots__ = ("deadline",)
+
+    def __init__(self, solver, deadline, batch_size=8192, stats=NO_STATS):
+        super().__init__(solver, batch_size, stats)
+        self.deadline = deadline
+
+    def flush(self):
+        super().flush()
+        if time.perf_counter() > self.deadline:
+            raise TimeoutError("Deadline passed after loading %d clauses" % (self.count,))
+
+# PARAMETERS:
+#   solver: solver của pysat (Ex: Glucose3)
+#   n, encoding, stages: như generate_clauses
+#   stats: SolveStats (NQueensStats) nhận thời gian các pha variables / encode / load và kích thước công thức
+#   deadline: mốc time.perf_counter(); nếu có, việc sinh công thức bị dừng bằng TimeoutError khi quá mốc
+#             (kiểm tra sau mỗi lô DeadlineSink.batch_size mệnh đề)
+# RETURN: (board, next_aux_var), các mệnh đề được nạp thẳng vào solver không qua list trung gian
+def load_clauses(solver, n, encoding, stages=(), stats=None, deadline=None):
+    stats = stats or NO_STATS
+    if deadline is not None and time.perf_counter() > deadline:
+        raise TimeoutError("Deadline passed before encoding n=%d" % (n,))
+    with stats.phase("variables"):
+        board = generate_variables(n)
+    sink = SolverSink(solver, stats=stats) if deadline is None else DeadlineSink(solver, deadline, stats=stats)
+    with stats.phase("encode"):
+        _, next_aux_var = generate_clauses(n, board, encoding, sink, stages)
+        sink.flush()
+    stats.count(clauses=sink.count, variables=next_aux_var - 1, aux_vars=next_aux_var - 1 - n * n)
+    return board, next_aux_var
+
+# Lời giải dạng vector cột: queens[i] là cột của quân hậu ở hàng i (-1 nếu hàng i không có hậu).
+# Ma trận 0/1 chỉ được tạo khi cần (thuộc tính board), vì với n lớn ma trận n x n rất tốn bộ nhớ.
+class Solution:
+    __slots__ = ("queens",)
+
+    def __init__(self, queens):
+        self.queens = list(queens)
+
+    @property
+    def n(self):
+        return len(self.queens)
+
+    @property
+    def board(self):
+        n = len(self.queens)
+        return [[int(self.queens[i] == j) for j in range(n)] for i in range(n)]
+
+    def __repr__(self):
+        return "Solution(%r)" % (self.queens,)
+
+    def __eq__(self, other):
+        return isinstance(other, Solution) and self.queens == other.queens
+
+    def __hash__(self):
+        return hash(tuple(self.queens))
+
+# PARAMETERS:
+#   model: model của solver (Ex: [1, -2, 3, ...]), phần tử thứ k ứng với biến k + 1.
+#          Có thể là list hoặc mảng NumPy; chỉ n*n phần tử đầu tiên được đọc.
+#   n: kích thước bàn cờ
+# RETURN: Solution ứng với n*n biến bàn cờ của model, truy cập trực tiếp theo chỉ số
+#         thay vì tìm `var in model` (O(n^2) thay vì O(n^2 * |model|)).
+def decode_model(model, n):
+    if np is not None and isinstance(model, np.ndarray):
+        cells = model[:n * n].reshape(n, n) > 0
+        queens = np.where(cells.any(axis=1), cells.argmax(axis=1), -1)
+        return Solution(queens.tolist())
+
+    queens = []
+    for i in range(n):
+        row = model[i * n:(i + 1) * n]
+        col = -1
+        for j, lit in enumerate(row):
+            if lit > 0:
+                col = j
+                break
+        queens.append(col)
+    return Solution(queens)
+
+# PARAMETERS:
+#   queens: vector cột (list, mảng NumPy hoặc Solution), queens[i] là cột của hậu ở hàng i
+#   placed: các hậu đặt sẵn (row, col) mà lời giải phải giữ nguyên
+# RETURN: True nếu đủ n hậu, mỗi hàng / cột / đường chéo có không quá một hậu và khớp với placed.
+#         Dùng NumPy (bincount) nếu có, O(n) thời gian và bộ nhớ.
+def is_solution(queens, placed=()):
+    if isinstance(queens, Solution):
+        queens = queens.queens
+    n = len(queens)
+    if any(not (0 <= row < n) or queens[row] != col for row, col in placed):
+        return False
+    if np is not None:
+        cols = np.asarray(queens, dtype=np.int64)
+        if n == 0:
+            return True
+        if cols.min() < 0 or cols.max() >= n:
+            return False
+        rows = np.arange(n)
+        return (np.bincount(cols, minlength=n).max() <= 1
+                and np.bincount(rows + cols, minlength=2 * n - 1).max() <= 1
+                and np.bincount(rows - cols + n - 1, minlength=2 * n - 1).max() <= 1)
+
+    if any(not (0 <= col < n) for col in queens):
+        return False
+    return (len(set(queens)) == n
+            and len({i + col for i, col in enumerate(queens)}) == n
+            and len({i - col for i, col in enumerate(queens)}) == n)
+
+# Hàm giải N-Queens với một Encoding bất kỳ
+#   solver_name: tên solver của pysat (Ex: "glucose3", "cadical195", "lingeling")
+#   stats: SolveStats (NQueensStats) để ghi thời gian từng pha, kích thước công thức và accum_stats
+# RETURN: Solution nếu SATISFIABLE, ngược lại None
+def find_solution(n, encoding, solver_name="glucose3", stats=None):
+    stats = stats or NO_STATS
+    stats.record(n=n, backend="sat", solver=solver_name)
+    solution = None
+    with Solver(name=solver_name) as solver:
+        load_clauses(solver, n, encoding, stats=stats)
+
+        with stats.phase("solve"):
+            sat = solver.solve()
+        if sat:
+            with stats.phase("decode"):
+                solution = decode_model(solver.get_model(), n)
+        stats.solver_stats(solver)
+    stats.finish(solution)
+    return solution
+
+# stats: SolveStats (NQueensStats) tuỳ chọn, như find_solution
+# RETURN: ma trận bàn cờ 0/1 nếu SATISFIABLE, ngược lại None
+def solve_with_encoding(n, encoding, stats=None):
+    solution = find_solution(n, encoding, stats=stats)
+    return solution.board if solution is not None else None
+
+def print_solution(solution):
+    if isinstance(solution, Solution):
+        solution = solution.board
+    if solution is None:
+        print("No solution found.")
+    else:
+        for row in solution:
+            print(" ".join("Q" if cell else "." for cell in row))
@@ -0,0 +1,174 @@
+﻿import argparse
+import gzip
+import lzma
+import os
+import shutil
+import tempfile
+
+from NQueensCore import Solution, generate_variables, generate_clauses, print_solution
+from NQueensSolver import ENCODINGS, get_encoding, add_encoding_arguments, encoding_params
+
+# Xuất công thức N-Queens ra file DIMACS (có thể nén .gz/.xz) cho các SAT solver bên ngoài,
+# và đọc lại model do solver bên ngoài trả về thành lời giải theo cách đánh số của generate_variables.
+# Cả hai chiều đều xử lý theo luồng, không giữ toàn bộ công thức / model trong bộ nhớ.
+
+COMPRESSED = (".gz", ".xz")
+
+# Số ký tự dành sẵn cho header ở đầu file không nén: một dòng comment đệm rồi dòng "p cnf nv số_clause",
+# đủ cho hai số 20 chữ số
+HEADER_SIZE = 64
+
+# Mở file văn bản, tự nén/giải nén theo phần mở rộng (.gz, .xz)
+def open_text(path, mode="rt"):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode)
+    if path.endswith(".xz"):
+        return lzma.open(path, mode)
+    return open(path, mode[0])
+
+# RETURN: header "p cnf" có độ dài đúng HEADER_SIZE ký tự (dòng comment đệm phía trước),
+#         để ghi đè vùng header đã dành sẵn mà không dịch chuyển phần còn lại của file
+def padded_header(nv, num_clauses):
+    header = "p cnf %d %d\n" % (nv, num_clauses)
+    return "c" + " " * (HEADER_SIZE - len(header) - 2) + "\n" + header
+
+# Nơi nhận mệnh đề ghi thẳng từng clause ra file theo định dạng DIMACS
+class DimacsSink:
+    __slots__ = ("f", "count")
+
+    def __init__(self, f):
+        self.f = f
+        self.count = 0
+
+    def append(self, clause):
+        self.f.write(" ".join(map(str, clause)))
+        self.f.write(" 0\n")
+        self.count += 1
+
+    def __len__(self):
+        return self.count
+
+# PARAMETERS:
+#   path: file đầu ra (.cnf, .cnf.gz, .cnf.xz)
+#   n: kích thước bàn cờ
+#   encoding: Encoding dùng để sinh công thức
+# RETURN: (nv, số clause) đã ghi vào header
+def write_dimacs(path, n, encoding):
+    """
+    Encoder chỉ chạy một lần, số clause và nv chỉ biết sau khi ghi xong:
+      - File không nén: dành sẵn HEADER_SIZE ký tự cho header (padded_header(0, 0)), ghi từng clause qua
+        DimacsSink, rồi quay lại ghi đè vùng đó bằng header thật cùng độ dài.
+      - File nén (.gz, .xz) không ghi đè được: ghi các clause vào file tạm không nén cạnh file đầu ra,
+        rồi ghi header và chép file tạm vào file nén.
+    """
+    board = generate_variables(n)
+    title = "c N-Queens n=%d, board variables 1..%d (row-major)\n" % (n, n * n)
+
+    if not path.endswith(COMPRESSED):
+        with open(path, "w") as f:
+            f.write(title)
+            start = f.tell()
+            f.write(padded_header(0, 0))
+            sink = DimacsSink(f)
+            _, next_aux_var = generate_clauses(n, board, encoding, sink)
+            f.seek(start)
+            f.write(padded_header(next_aux_var - 1, sink.count))
+        return next_aux_var - 1, sink.count
+
+    with tempfile.TemporaryFile("w+", dir=os.path.dirname(os.path.abspath(path))) as body:
+        sink = DimacsSink(body)
+        _, next_aux_var = generate_clauses(n, board, encoding, sink)
+        body.seek(0)
+        with open_text(path, "wt") as f:
+            f.write(title)
+            f.write("p cnf %d %d\n" % (next_aux_var - 1, sink.count))
+            shutil.copyfileobj(body, f, 1 << 20)
+    return next_aux_var - 1, sink.count
+
+# RETURN: lần lượt từng clause (list[int]) trong file DIMACS
+def iter_dimacs(path):
+    clause = []
+    with open_text(path) as f:
+        for line in f:
+            if not line.strip() or line[0] in "cp%":
+                continue
+            for token in line.split():
+                lit = int(token)
+                if lit == 0:
+                    yield clause
+                    clause = []
+                else:
+                    clause.append(lit)
+    if clause:
+        yield clause
+
+# Nạp file DIMACS vào solver của pysat theo từng lô
+def load_dimacs(solver, path, batch_size=65536):
+    batch = []
+    for clause in iter_dimacs(path):
+        batch.append(clause)
+        if len(batch) >= batch_size:
+            solver.append_formula(batch)
+            batch = []
+    if batch:
+        solver.append_formula(batch)
+
+# PARAMETERS:
+#   path: output của solver bên ngoài, theo định dạng thi đấu ("s SATISFIABLE" + các dòng "v ...")
+#         hoặc định dạng của minisat ("SAT" + một dòng literal)
+#   n: kích thước bàn cờ
+# RETURN: Solution nếu SAT, None nếu UNSAT
+def read_model(path, n):
+    status = None
+    queens = [-1] * n
+    limit = n * n
+    with open_text(path) as f:
+        for line in f:
+            tokens = line.split()
+            if not tokens or tokens[0] == "c":
+                continue
+            if tokens[0] == "s":
+                status = tokens[1] if len(tokens) > 1 else None
+                continue
+            if tokens[0] in ("SAT", "SATISFIABLE", "UNSAT", "UNSATISFIABLE", "INDET", "UNKNOWN"):
+                status = tokens[0]
+                continue
+            if tokens[0] == "v":
+                tokens = tokens[1:]
+            for token in tokens:
+                lit = int(token)
+                # Chỉ các biến bàn cờ (1..n*n) đang TRUE mới cần: biến k ứng với ô ((k-1) // n, (k-1) % n)
+                if 0 < lit <= limit:
+                    row, col = divmod(lit - 1, n)
+                    queens[row] = col
+
+    if status in ("UNSAT", "UNSATISFIABLE"):
+        return None
+    if status not in ("SAT", "SATISFIABLE"):
+        raise ValueError("Solver output %s has no SAT/UNSAT status (got %r)" % (path, status))
+    return Solution(queens)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Xuất N-Queens ra DIMACS và đọc model từ solver bên ngoài.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export = commands.add_parser("export", help="ghi công thức ra file DIMACS")
+    export.add_argument("n", type=int)
+    export.add_argument("-o", "--output", required=True, help="file đầu ra (.cnf, .cnf.gz, .cnf.xz)")
+    export.add_argument("--encoding", default="sequential", choices=sorted(ENCODINGS))
+    add_encoding_arguments(export)
+
+    decode = commands.add_parser("decode", help="đọc model của solver bên ngoài thành bàn cờ")
+    decode.add_argument("n", type=int)
+    decode.add_argument("model", help="file output của solver")
+    args = parser.parse_args(argv)
+
+    if args.command == "export":
+        nv, num_clauses = write_dimacs(args.output, args.n, get_encoding(args.encoding, **encoding_params(args)))
+        print("Wrote %s: %d variables, %d clauses" % (args.output, nv, num_clauses))
+    else:
+        print_solution(read_model(args.model, args.n))
+
+
+if __name__ == "__main__":
+    main()
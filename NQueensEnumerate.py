@@ -0,0 +1,88 @@
+﻿from pysat.solvers import Glucose3
+
+from NQueensCore import load_clauses, decode_model
+from NQueensSymmetry import images, orbit, canonical, symmetry_breaking as lex_leader
+from NQueensStats import NO_STATS
+
+# Liệt kê lời giải trên một solver duy nhất: sau mỗi model thêm một mệnh đề chặn,
+# solver giữ lại các mệnh đề học được nên không phải dựng lại công thức cho mỗi lời giải.
+
+# PARAMETERS:
+#   n: kích thước bàn cờ
+#   encoding: Encoding dùng để sinh công thức
+#   canonical_only: chỉ trả về một đại diện cho mỗi quỹ đạo đối xứng (8 phép đối xứng của bàn cờ)
+#   symmetry_breaking: thêm ràng buộc lex-leader vào công thức (NQueensSymmetry.symmetry_breaking),
+#                      solver chỉ tìm được lời giải nhỏ nhất (theo thứ tự từ điển) của mỗi quỹ đạo
+#   depth: số ô đầu tiên được ràng buộc lex-leader, None là toàn bộ bàn cờ
+#   stats: SolveStats (NQueensStats) tuỳ chọn: các pha load, solve, decode, block cộng dồn qua mọi lời giải,
+#          số lời giải (solutions) và status SAT nếu có ít nhất một lời giải; ghi khi duyệt xong hoặc dừng giữa chừng
+# RETURN: lần lượt từng Solution, sinh dần theo yêu cầu
+def iter_solutions_sat(n, encoding, canonical_only=False, symmetry_breaking=False, depth=None, stats=None):
+    stats = stats or NO_STATS
+    stats.record(n=n, backend="sat", solver="glucose3", enumerate=True)
+    stages = (lex_leader(depth),) if symmetry_breaking else ()
+    found = 0
+    solution = None
+    with Glucose3() as solver:
+        try:
+            board, _ = load_clauses(solver, n, encoding, stages, stats)
+
+            while True:
+                with stats.phase("solve"):
+                    if not solver.solve():
+                        break
+                with stats.phase("decode"):
+                    solution = decode_model(solver.get_model(), n)
+                found += 1
+                if canonical_only:
+                    # Chặn cả quỹ đạo để solver không tìm lại các ảnh đối xứng
+                    with stats.phase("block"):
+                        for q in images(solution.queens):
+                            solver.add_clause(blocking_clause(board, q))
+                    yield canonical(solution.queens)
+                else:
+                    with stats.phase("block"):
+                        solver.add_clause(blocking_clause(board, solution.queens))
+                    yield solution
+        finally:
+            stats.record(solutions=found)
+            stats.solver_stats(solver)
+            stats.finish(solution)
+
+# Mệnh đề chặn chỉ gồm n biến hậu đang TRUE (không dùng biến phụ):
+#   (¬x[0][q0] ∨ ¬x[1][q1] ∨ ... ∨ ¬x[n-1][q(n-1)])
+def blocking_clause(board, queens):
+    return [-board[i][j] for i, j in enumerate(queens)]
+
+# RETURN: số lời giải; nếu canonical_only hoặc symmetry_breaking thì cộng độ lớn quỹ đạo của từng đại diện
+def count_solutions_sat(n, encoding, canonical_only=False, symmetry_breaking=False, stats=None):
+    if symmetry_breaking:
+        solutions = iter_solutions_sat(n, encoding, symmetry_breaking=True, stats=stats)
+        return sum(len(orbit(s.queens)) for s in solutions)
+    if canonical_only:
+        return sum(len(orbit(s.queens)) for s in iter_solutions_sat(n, encoding, True, stats=stats))
+    return sum(1 for _ in iter_solutions_sat(n, encoding, stats=stats))
+
+# Số lời giải (tổng và số quỹ đạo đối xứng) đã biết cho n = 1..9 (OEIS A000170, A002562)
+KNOWN_TOTALS = (1, 0, 0, 2, 10, 4, 40, 92, 352)
+KNOWN_UNIQUE = (1, 0, 0, 1, 2, 1, 6, 12, 46)
+
+# Kiểm tra lex-leader: với symmetry_breaking=True, số đại diện phải bằng số quỹ đạo đã biết
+# và tổng độ lớn quỹ đạo phải bằng tổng số lời giải đã biết.
+# RETURN: danh sách (n, số đại diện, tổng) đã kiểm tra; sai thì AssertionError
+def check_symmetry_breaking(encoding, max_n=len(KNOWN_TOTALS)):
+    results = []
+    for n in range(1, max_n + 1):
+        sizes = [len(orbit(s.queens)) for s in iter_solutions_sat(n, encoding, symmetry_breaking=True)]
+        assert len(sizes) == KNOWN_UNIQUE[n - 1], "n=%d: %d representatives, expected %d" % (n, len(sizes), KNOWN_UNIQUE[n - 1])
+        assert sum(sizes) == KNOWN_TOTALS[n - 1], "n=%d: %d solutions, expected %d" % (n, sum(sizes), KNOWN_TOTALS[n - 1])
+        results.append((n, len(sizes), sum(sizes)))
+    return results
+
+
+if __name__ == "__main__":
+    from NQueensSequential import SEQUENTIAL
+
+    for n, unique, total in check_symmetry_breaking(SEQUENTIAL):
+        print("n=%d: %d unique, %d total" % (n, unique, total))
+    print("Symmetry breaking OK")
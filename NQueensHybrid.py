@@ -0,0 +1,102 @@
+﻿import time
+
+from NQueensCore import Encoding, find_solution, generate_variables, generate_clauses
+from NQueensBinomial import at_most_one_aux, exactly_one_aux
+from NQueensSequential import at_most_one_seq, exactly_one_seq
+from NQueensBinary import at_most_one_binary, exactly_one_binary
+from NQueensProduct import product_amo, exactly_one_product
+from NQueensCommander import commander_at_most_one, commander_exactly_one, best_group_size
+from NQueensBimander import bimander_amo, exactly_one_bimander
+from NQueensLadder import ladder_amo, exactly_one_ladder
+from NewSequentialCounterEncoding import nsc_at_most_one, nsc_exactly_one
+
+# Công thức lai: mỗi đường (hàng, cột, đường chéo) chọn encoding riêng theo độ dài và vai trò.
+# Đường chéo có độ dài từ 2 đến n, AMO tốt nhất cho đường 2 ô (binomial, không biến phụ)
+# khác với AMO tốt nhất cho hàng n ô (product, commander, ...).
+
+# Các hàm AMO / EO theo tên, cùng chữ ký f(clauses, variables, next_aux_var) -> next_aux_var.
+# Commander nhận thêm group_size nên được xử lý riêng trong _pick.
+AMO = {
+    "binomial": at_most_one_aux,
+    "sequential": at_most_one_seq,
+    "binary": at_most_one_binary,
+    "product": product_amo,
+    "nsc": nsc_at_most_one,
+    "bimander": bimander_amo,
+    "ladder": ladder_amo,
+}
+EO = {
+    "binomial": exactly_one_aux,
+    "sequential": exactly_one_seq,
+    "binary": exactly_one_binary,
+    "product": exactly_one_product,
+    "nsc": nsc_exactly_one,
+    "bimander": exactly_one_bimander,
+    "ladder": exactly_one_ladder,
+}
+NAMES = sorted(AMO) + ["commander"]
+
+# PARAMETERS:
+#   name: tên encoding trong NAMES
+#   exactly: True nếu cần EO (hàng, cột), False nếu chỉ cần AMO (đường chéo)
+#   group_size: kích thước nhóm cho commander, "auto" để chọn theo best_group_size
+def _pick(name, exactly, group_size):
+    if name == "commander":
+        commander = commander_exactly_one if exactly else commander_at_most_one
+
+        def f(clauses, variables, next_aux_var):
+            g = best_group_size(len(variables)) if group_size == "auto" else group_size
+            return commander(clauses, variables, g, next_aux_var)
+        return f
+    if name not in AMO:
+        raise ValueError("Unknown encoding %r for hybrid, expected one of: %s" % (name, ", ".join(NAMES)))
+    return EO[name] if exactly else AMO[name]
+
+# RETURN: hàm ràng buộc chọn small cho đường có ít hơn threshold biến, ngược lại chọn large
+def _by_length(exactly, small, large, threshold, group_size):
+    small_f = _pick(small, exactly, group_size)
+    large_f = _pick(large, exactly, group_size)
+
+    def f(clauses, variables, next_aux_var):
+        if len(variables) < threshold:
+            return small_f(clauses, variables, next_aux_var)
+        return large_f(clauses, variables, next_aux_var)
+    return f
+
+def hybrid_encoding(threshold=6, small="binomial", large="product", group_size="auto",
+                    rows=None, cols=None, diags=None):
+    """
+    Encoding lai theo độ dài đường:
+      - Đường có ít hơn threshold biến dùng small, còn lại dùng large.
+      - rows / cols / diags (dict, tuỳ chọn) ghi đè threshold, small, large cho từng vai trò,
+        Ex: diags={"threshold": 8, "large": "commander"}.
+      - group_size của commander: số cố định hoặc "auto" (best_group_size theo độ dài từng đường).
+    """
+    defaults = {"threshold": threshold, "small": small, "large": large}
+
+    def role(overrides, exactly):
+        options = dict(defaults, **(overrides or {}))
+        return _by_length(exactly, options["small"], options["large"], options["threshold"], group_size)
+
+    return Encoding(role(rows, True), role(cols, True), role(diags, False))
+
+# PARAMETERS:
+#   n: kích thước bàn cờ dùng để đo
+#   candidates: các group_size cần thử ("auto" cũng được)
+#   trials: số lần giải cho mỗi group_size
+#   params: tham số còn lại cho hybrid_encoding (Ex: large="commander")
+# RETURN: group_size có thời gian giải trung bình nhỏ nhất; hoà (chênh < 5%) thì chọn công thức ít mệnh đề hơn
+def tune_group_size(n, candidates=("auto", 2, 3, 4, 5, 6, 8), trials=3, **params):
+    params.setdefault("large", "commander")
+    scores = []
+    for g in candidates:
+        encoding = hybrid_encoding(group_size=g, **params)
+        clauses, _ = generate_clauses(n, generate_variables(n), encoding)
+        start = time.perf_counter()
+        for _ in range(trials):
+            find_solution(n, encoding)
+        scores.append(((time.perf_counter() - start) / trials, len(clauses), g))
+
+    fastest = min(score[0] for score in scores)
+    close = [score for score in scores if score[0] <= fastest * 1.05]
+    return min(close, key=lambda score: (score[1], score[0]))[2]
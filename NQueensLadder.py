@@ -0,0 +1,70 @@
+﻿from NQueensCore import make_encoding, solve_with_encoding, print_solution
+
+# Ký tự: ∨ ∧ ↔
+
+# Ladder / regular encoding (Gent & Nightingale): m - 1 biến phụ y_1 ... y_{m-1} tạo thành "cái thang"
+# y_{i+1} -> y_i, y_i nghĩa là "biến TRUE (nếu có) nằm sau vị trí i".
+
+# RETURN: (y_vars, next_aux_var) sau khi thêm các mệnh đề thang (-y_{i+1} ∨ y_i)
+def ladder_vars(clauses, m, next_aux_var):
+    y_vars = list(range(next_aux_var, next_aux_var + m - 1))
+    next_aux_var += m - 1
+    for i in range(len(y_vars) - 1):
+        clauses.append([-y_vars[i + 1], y_vars[i]])
+    return y_vars, next_aux_var
+
+# RETURN: trả về next_aux_var sau khi đã cấp phát các biến phụ.
+def ladder_amo(clauses, variables, next_aux_var):
+    """
+    Các bước (chỉ một chiều của liên kết x_i ↔ (y_{i-1} ∧ ¬y_i)):
+      - Thêm các mệnh đề thang (-y_{i+1} ∨ y_i).
+      - x_1 -> ¬y_1:            (-x_1 ∨ -y_1)
+      - x_i -> y_{i-1} ∧ ¬y_i:  (-x_i ∨ y_{i-1}), (-x_i ∨ -y_i)  với 1 < i < m
+      - x_m -> y_{m-1}:         (-x_m ∨ y_{m-1})
+      Nếu x_i và x_j (i < j) cùng TRUE thì ¬y_i và y_{j-1}, mâu thuẫn với thang y_{j-1} -> ... -> y_i.
+    """
+    m = len(variables)
+    if m < 2:
+        return next_aux_var
+    y_vars, next_aux_var = ladder_vars(clauses, m, next_aux_var)
+    for i, x in enumerate(variables):
+        if i > 0:
+            clauses.append([-x, y_vars[i - 1]])
+        if i < m - 1:
+            clauses.append([-x, -y_vars[i]])
+    return next_aux_var
+
+# RETURN: trả về next_aux_var đã được cập nhật
+def exactly_one_ladder(clauses, variables, next_aux_var):
+    """
+    Liên kết đầy đủ x_i ↔ (y_{i-1} ∧ ¬y_i): thêm chiều ngược lại của ladder_amo
+      (y_1 ∨ x_1), (-y_{i-1} ∨ y_i ∨ x_i), (-y_{m-1} ∨ x_m)
+    Mỗi phép gán của thang chọn đúng một x_i, nên không cần mệnh đề ALO dài m literal.
+    """
+    m = len(variables)
+    if m < 2:
+        clauses.append(list(variables))
+        return next_aux_var
+    first = next_aux_var
+    next_aux_var = ladder_amo(clauses, variables, next_aux_var)
+    y_vars = list(range(first, next_aux_var))
+    for i, x in enumerate(variables):
+        clause = [x]
+        if i > 0:
+            clause.append(-y_vars[i - 1])
+        if i < m - 1:
+            clause.append(y_vars[i])
+        clauses.append(clause)
+    return next_aux_var
+
+LADDER = make_encoding(exactly_one_ladder, ladder_amo)
+
+# Hàm giải N-Queens sử dụng Ladder Encoding
+def solve_nqueens_ladder(n):
+    return solve_with_encoding(n, LADDER)
+
+
+if __name__ == "__main__":
+    n = 8  # Thay đổi kích thước theo ý muốn
+    solution = solve_nqueens_ladder(n)
+    print_solution(solution)
@@ -0,0 +1,207 @@
+﻿import random
+import time
+
+import numpy as np
+
+from NQueensCore import Solution, is_solution, print_solution
+from NQueensStats import NO_STATS
+
+# Tìm kiếm cục bộ (min-conflicts) cho n rất lớn (10^4 - 10^6): lời giải là một hoán vị queens (mỗi hàng,
+# mỗi cột đúng một hậu), nên chỉ còn xung đột trên đường chéo. Hai mảng NumPy đếm số hậu trên mỗi
+# đường chéo chính (i + j) và phụ (i - j + n - 1), mỗi bước đổi chỗ hai hàng chỉ cập nhật O(1) ô đếm.
+# Không chứng minh được vô nghiệm: không tìm thấy trong giới hạn thì trả về None.
+
+# Số cột ngẫu nhiên thử cho mỗi hàng khi khởi tạo tham lam trước khi chấp nhận một ô có xung đột
+INIT_TRIES = 128
+
+# Số hàng ngẫu nhiên thử đổi chỗ với một hàng đang bị tấn công trước khi bỏ qua hàng đó
+SWAP_TRIES = 32
+
+# Số bước sửa tối đa mặc định cho mỗi lần khởi tạo (nhân với n), hết thì khởi tạo lại
+STEPS_PER_QUEEN = 4
+
+# Số lần khởi tạo lại mặc định khi không có time_limit: max(RESTARTS, SMALL_BOARD_RESTARTS // n).
+# Bàn cờ nhỏ có rất ít lời giải nên hay kẹt ở cực tiểu địa phương, cần nhiều lần khởi tạo lại hơn
+# (với 10 lần, n = 6 thất bại ở khoảng 1/5 số seed), mỗi lần lại rất rẻ.
+RESTARTS = 10
+SMALL_BOARD_RESTARTS = 1000
+
+# Bàn cờ n hậu với các hàng cố định, giữ hoán vị queens và các bộ đếm đường chéo
+class _Board:
+    __slots__ = ("n", "queens", "diag", "anti", "free", "rng")
+
+    def __init__(self, n, fixed, rng):
+        self.n = n
+        self.rng = rng
+        self.queens = np.full(n, -1, dtype=np.int64)
+        self.diag = np.zeros(max(2 * n - 1, 1), dtype=np.int32)     # i + j
+        self.anti = np.zeros(max(2 * n - 1, 1), dtype=np.int32)     # i - j + n - 1
+        for row, col in fixed.items():
+            self.place(row, col)
+        self.free = np.array(sorted(set(range(n)) - set(fixed)), dtype=np.int64)
+
+    def place(self, row, col):
+        self.queens[row] = col
+        self.diag[row + col] += 1
+        self.anti[row - col + self.n - 1] += 1
+
+    # Số hậu khác cùng đường chéo với hậu ở hàng row
+    def attacks(self, row):
+        col = self.queens[row]
+        return int(self.diag[row + col] + self.anti[row - col + self.n - 1]) - 2
+
+    def initialize(self, cols):
+        """
+        Khởi tạo tham lam: duyệt các hàng tự do theo thứ tự ngẫu nhiên, thử tối đa INIT_TRIES cột còn trống
+        (chọn ngẫu nhiên) và lấy cột đầu tiên không có xung đột đường chéo; nếu không có thì lấy cột thử cuối.
+        Với n lớn hầu hết các hàng không có xung đột nên pha sửa chỉ còn rất ít việc.
+        Vòng lặp từng ô chạy trên list Python (truy cập từng phần tử nhanh hơn mảng NumPy),
+        cuối cùng mới ghi lại vào các mảng NumPy.
+        """
+        n = self.n
+        rand = random.Random(int(self.rng.integers(1 << 62))).random
+        pool = self.rng.permutation(cols).tolist()
+        queens, diag, anti = self.queens.tolist(), self.diag.tolist(), self.anti.tolist()
+        for row in self.rng.permutation(self.free).tolist():
+            for _ in range(min(INIT_TRIES, len(pool))):
+                k = int(rand() * len(pool))
+                col = pool[k]
+                if diag[row + col] == 0 and anti[row - col + n - 1] == 0:
+                    break
+            pool[k] = pool[-1]
+            pool.pop()
+            queens[row] = col
+            diag[row + col] += 1
+            anti[row - col + n - 1] += 1
+        self.queens[:] = queens
+        self.diag[:] = diag
+        self.anti[:] = anti
+
+    # Đổi cột của hai hàng i, j. RETURN: thay đổi số cặp hậu tấn công nhau (âm là tốt hơn)
+    def swap(self, i, j):
+        n = self.n
+        diag, anti, queens = self.diag, self.anti, self.queens
+        ci, cj = int(queens[i]), int(queens[j])
+        delta = 0
+        for row, col in ((i, ci), (j, cj)):
+            diag[row + col] -= 1
+            anti[row - col + n - 1] -= 1
+            delta -= int(diag[row + col] + anti[row - col + n - 1])
+        for row, col in ((i, cj), (j, ci)):
+            delta += int(diag[row + col] + anti[row - col + n - 1])
+            diag[row + col] += 1
+            anti[row - col + n - 1] += 1
+        queens[i], queens[j] = cj, ci
+        return delta
+
+    # RETURN: các hàng tự do đang bị tấn công (tính bằng NumPy trên toàn bộ bàn cờ)
+    def conflicted(self):
+        rows = self.free
+        cols = self.queens[rows]
+        hit = (self.diag[rows + cols] > 1) | (self.anti[rows - cols + self.n - 1] > 1)
+        return rows[hit]
+
+    def repair(self, max_steps, deadline):
+        """
+        Min-conflicts bằng phép đổi chỗ (giữ hoán vị):
+          - Lấy ngẫu nhiên một hàng tự do i đang bị tấn công.
+          - Chọn SWAP_TRIES hàng tự do j ngẫu nhiên; NumPy lọc ra các j mà sau khi đổi cả hai ô mới đều nằm trên
+            đường chéo trống (thường giảm số cặp tấn công). Nếu không có j nào như vậy thì thử lần lượt mọi j.
+          - Nhận phép đổi đầu tiên làm giảm số cặp tấn công; nếu không có thì bỏ qua hàng i ở vòng này
+            (kẹt ở cực tiểu địa phương thì khởi tạo lại).
+          - Khi danh sách hàng bị tấn công đã duyệt hết thì tính lại bằng conflicted(); rỗng nghĩa là xong.
+        RETURN: True nếu hết xung đột, False nếu hết max_steps hoặc quá deadline
+        """
+        n = self.n
+        rng = self.rng
+        free = self.free
+        queens, diag, anti = self.queens, self.diag, self.anti
+        tries = min(SWAP_TRIES, len(free))
+        steps = 0
+        while steps < max_steps:
+            todo = self.conflicted()
+            if len(todo) == 0:
+                return True
+            if len(free) < 2 or (deadline is not None and time.perf_counter() > deadline):
+                return False
+            for i in rng.permutation(todo).tolist():
+                if self.attacks(i) == 0:
+                    continue
+                ci = queens[i]
+                js = free[rng.integers(len(free), size=tries)]
+                cjs = queens[js]
+                empty = ((diag[i + cjs] == 0) & (anti[i - cjs + n - 1] == 0)
+                         & (diag[js + ci] == 0) & (anti[js - ci + n - 1] == 0))
+                if empty.any():
+                    js = js[empty]
+                for j in js.tolist():
+                    if j == i:
+                        continue
+                    if self.swap(i, j) < 0:
+                        break
+                    self.swap(i, j)     # không tốt hơn: đổi lại
+                steps += 1
+                if steps >= max_steps:
+                    break
+        return False
+
+# PARAMETERS:
+#   n: kích thước bàn cờ
+#   placed: các hậu đặt sẵn (row, col), các hàng này không bao giờ bị đổi
+#   seed: hạt giống cho np.random.default_rng (cùng seed cho cùng kết quả)
+#   max_steps: số bước sửa tối đa mỗi lần khởi tạo, mặc định STEPS_PER_QUEEN * n
+#   restarts: số lần khởi tạo lại tối đa; None: khởi tạo lại tới khi hết time_limit nếu có,
+#             ngược lại max(RESTARTS, SMALL_BOARD_RESTARTS // n)
+#   time_limit: thời gian tối đa (giây), None là không giới hạn
+#   stats: SolveStats (NQueensStats) tuỳ chọn
+# RETURN: Solution đã được kiểm tra bằng is_solution, hoặc None nếu không tìm thấy (hoặc placed tự mâu thuẫn)
+def find_solution_local(n, placed=(), seed=None, max_steps=None, restarts=None, time_limit=None, stats=None):
+    stats = stats or NO_STATS
+    stats.record(n=n, backend="local", seed=seed)
+    deadline = None if time_limit is None else time.perf_counter() + time_limit
+
+    fixed = {}
+    for row, col in placed:
+        if not (0 <= row < n and 0 <= col < n):
+            raise ValueError("Queen (%d, %d) is outside the %dx%d board" % (row, col, n, n))
+        if fixed.get(row, col) != col:
+            raise ValueError("Row %d has two pre-placed queens" % (row,))
+        fixed[row] = col
+    # Các hậu đặt sẵn tấn công nhau thì không có lời giải
+    if (len(set(fixed.values())) < len(fixed) or len({r + c for r, c in fixed.items()}) < len(fixed)
+            or len({r - c for r, c in fixed.items()}) < len(fixed)):
+        stats.finish(None)
+        return None
+
+    if restarts is None and deadline is None:
+        restarts = max(RESTARTS, SMALL_BOARD_RESTARTS // max(n, 1))
+    rng = np.random.default_rng(seed)
+    cols = np.array(sorted(set(range(n)) - set(fixed.values())), dtype=np.int64)
+    solution = None
+    attempt = 0
+    while restarts is None or attempt <= restarts:
+        attempt += 1
+        board = _Board(n, fixed, rng)
+        with stats.phase("init"):
+            board.initialize(cols)
+        with stats.phase("repair"):
+            done = board.repair(STEPS_PER_QUEEN * n + 100 if max_steps is None else max_steps, deadline)
+        if done:
+            with stats.phase("validate"):
+                if not is_solution(board.queens, fixed.items()):
+                    raise RuntimeError("Local search produced an invalid board for n=%d" % (n,))
+            solution = Solution(board.queens.tolist())
+            break
+        if deadline is not None and time.perf_counter() > deadline:
+            break
+    stats.finish(solution, None if solution is not None else "UNKNOWN")
+    return solution
+
+
+if __name__ == "__main__":
+    n = 100000  # Thay đổi kích thước theo ý muốn
+    start = time.perf_counter()
+    solution = find_solution_local(n, seed=0)
+    print("n=%d: %s in %.2fs" % (n, "found" if solution is not None else "not found", time.perf_counter() - start))
+    if solution is not None and n <= 50:
+        print_solution(solution)
@@ -0,0 +1,95 @@
+﻿from pysat.card import CardEnc, EncType
+from pysat.solvers import Solver
+
+from NQueensCore import make_encoding, generate_variables, diagonals, decode_model
+from NQueensStats import NO_STATS
+
+# Ràng buộc bản số sinh bởi pysat.card (CardEnc, viết bằng C++) thay cho các hàm AMO viết tay,
+# để so sánh trực tiếp với các encoding Python. ID biến phụ vẫn được cấp phát liên tiếp qua
+# next_aux_var (top_id = next_aux_var - 1), giống như các encoding khác.
+
+# Các kiểu mã hoá của CardEnc có thể chọn
+CARD_TYPES = {
+    "pairwise": EncType.pairwise,
+    "seqcounter": EncType.seqcounter,
+    "sortnetwrk": EncType.sortnetwrk,
+    "cardnetwrk": EncType.cardnetwrk,
+    "bitwise": EncType.bitwise,
+    "ladder": EncType.ladder,
+    "totalizer": EncType.totalizer,
+    "mtotalizer": EncType.mtotalizer,
+    "kmtotalizer": EncType.kmtotalizer,
+}
+
+# PARAMETERS:
+#   clauses: danh sách các mệnh đề đang có
+#   cnf: công thức do CardEnc trả về
+#   next_aux_var: ID biến tiếp theo trước khi gọi CardEnc
+# RETURN: next_aux_var sau khi thêm các mệnh đề của cnf
+def _append_card(clauses, cnf, next_aux_var):
+    for clause in cnf.clauses:
+        clauses.append(clause)
+    return max(next_aux_var, cnf.nv + 1)
+
+def card_at_most_k(clauses, variables, k, next_aux_var, card="seqcounter"):
+    cnf = CardEnc.atmost(lits=variables, bound=k, top_id=next_aux_var - 1, encoding=CARD_TYPES[card])
+    return _append_card(clauses, cnf, next_aux_var)
+
+def card_exactly_k(clauses, variables, k, next_aux_var, card="seqcounter"):
+    cnf = CardEnc.equals(lits=variables, bound=k, top_id=next_aux_var - 1, encoding=CARD_TYPES[card])
+    return _append_card(clauses, cnf, next_aux_var)
+
+# RETURN: Encoding dùng CardEnc với kiểu mã hoá card cho hàng, cột và đường chéo
+def card_encoding(card="seqcounter"):
+    if card not in CARD_TYPES:
+        raise ValueError("Unknown cardinality encoding %r, expected one of: %s" % (card, ", ".join(CARD_TYPES)))
+
+    def exactly_one(clauses, variables, next_aux_var):
+        return card_exactly_k(clauses, variables, 1, next_aux_var, card)
+
+    def at_most_one(clauses, variables, next_aux_var):
+        return card_at_most_k(clauses, variables, 1, next_aux_var, card)
+
+    return make_encoding(exactly_one, at_most_one)
+
+# Hàm giải N-Queens trên solver hỗ trợ ràng buộc bản số trực tiếp (Minicard, Gluecard):
+# AMO được thêm bằng add_atmost nên không bị khai triển thành mệnh đề, không có biến phụ.
+# RETURN: Solution nếu SATISFIABLE, ngược lại None
+def find_solution_native(n, solver_name="minicard", stats=None):
+    stats = stats or NO_STATS
+    stats.record(n=n, backend="native", solver=solver_name)
+    with stats.phase("variables"):
+        board = generate_variables(n)
+    solution = None
+    with Solver(name=solver_name) as solver:
+        if not solver.supports_atmost():
+            raise ValueError("Solver %r has no native cardinality support, use minicard or gluecard" % (solver_name,))
+        with stats.phase("load"):
+            num_clauses, num_atmost = load_native(solver, n, board)
+        stats.count(clauses=num_clauses, atmost=num_atmost, variables=n * n, aux_vars=0)
+
+        with stats.phase("solve"):
+            sat = solver.solve()
+        if sat:
+            with stats.phase("decode"):
+                solution = decode_model(solver.get_model(), n)
+        stats.solver_stats(solver)
+    stats.finish(solution)
+    return solution
+
+# Thêm ALO (mệnh đề) và AMO (add_atmost) cho hàng, cột và đường chéo vào solver
+# RETURN: (số mệnh đề, số ràng buộc atmost) đã thêm
+def load_native(solver, n, board):
+    num_atmost = 0
+    for i in range(n):
+        row_vars = board[i]
+        solver.add_clause(row_vars)
+        solver.add_atmost(row_vars, 1)
+    for j in range(n):
+        col_vars = [board[i][j] for i in range(n)]
+        solver.add_clause(col_vars)
+        solver.add_atmost(col_vars, 1)
+    for diag in diagonals(n, board):
+        solver.add_atmost(diag, 1)
+        num_atmost += 1
+    return 2 * n, 2 * n + num_atmost
@@ -0,0 +1,144 @@
+﻿import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import queue
+import time
+from collections import namedtuple
+
+from NQueensCore import Solution, find_solution, print_solution
+from NQueensSolver import ENCODINGS, get_encoding
+
+# Portfolio: chạy song song nhiều tổ hợp encoding x solver, mỗi tổ hợp trong một process riêng.
+# Tổ hợp xong đầu tiên thắng, các process còn lại bị dừng (terminate) ngay lập tức.
+
+DEFAULT_ENCODINGS = ("sequential", "product", "binary", "commander")
+DEFAULT_SOLVERS = ("glucose3", "glucose4", "cadical195", "maplechrono", "lingeling")
+
+# Khoảng thời gian (giây) giữa các lần kiểm tra process con bị chết bất thường
+POLL_INTERVAL = 0.5
+
+# Kết quả portfolio: lời giải (Solution hoặc None nếu UNSAT), tổ hợp thắng và thời gian (giây)
+PortfolioResult = namedtuple("PortfolioResult", ["solution", "encoding", "solver", "time"])
+
+# Chạy trong process con, gửi (encoding, solver, queens hoặc None, thời gian, lỗi) về hàng đợi
+def _worker(n, encoding_name, solver_name, params, results):
+    start = time.perf_counter()
+    try:
+        solution = find_solution(n, get_encoding(encoding_name, **params), solver_name)
+        queens = solution.queens if solution is not None else None
+        results.put((encoding_name, solver_name, queens, time.perf_counter() - start, None))
+    except Exception as e:
+        results.put((encoding_name, solver_name, None, time.perf_counter() - start, repr(e)))
+
+# PARAMETERS:
+#   n: kích thước bàn cờ
+#   encodings, solvers: các encoding (ENCODINGS) và solver (tên trong pysat) được kết hợp với nhau
+#   max_workers: số process chạy cùng lúc, mặc định bằng số CPU
+#   timeout: thời gian tối đa (giây), hết thời gian trả về None
+#   history: file JSON lines để ghi lại tổ hợp thắng (dùng cho best_combination)
+#   params: tham số riêng cho từng encoding, Ex: {"commander": {"group_size": 4}}
+# RETURN: PortfolioResult của tổ hợp xong đầu tiên, hoặc None nếu hết thời gian / mọi tổ hợp đều lỗi
+def solve_portfolio(n, encodings=DEFAULT_ENCODINGS, solvers=DEFAULT_SOLVERS, max_workers=None,
+                    timeout=None, history=None, params=None):
+    combos = list(itertools.product(encodings, solvers))
+    max_workers = max_workers or os.cpu_count() or 1
+    results = multiprocessing.Queue()
+    running = []
+    start = time.perf_counter()
+    finished = 0
+
+    def launch():
+        encoding_name, solver_name = combos[len(running)]
+        process = multiprocessing.Process(
+            target=_worker, args=(n, encoding_name, solver_name, (params or {}).get(encoding_name, {}), results),
+            daemon=True)
+        process.start()
+        running.append(process)
+
+    try:
+        while len(running) < min(max_workers, len(combos)):
+            launch()
+
+        crashed = set()
+        while finished < len(combos):
+            remaining = None if timeout is None else timeout - (time.perf_counter() - start)
+            if remaining is not None and remaining <= 0:
+                return None
+            try:
+                item = results.get(timeout=POLL_INTERVAL if remaining is None else min(remaining, POLL_INTERVAL))
+            except queue.Empty:
+                # Process chết mà không gửi kết quả (Ex: solver bị crash) được tính như một tổ hợp lỗi
+                for process in running:
+                    if process.exitcode not in (None, 0) and process.pid not in crashed:
+                        crashed.add(process.pid)
+                        finished += 1
+                        if len(running) < len(combos):
+                            launch()
+                continue
+
+            encoding_name, solver_name, queens, elapsed, error = item
+            finished += 1
+            if error is None:
+                solution = Solution(queens) if queens is not None else None
+                result = PortfolioResult(solution, encoding_name, solver_name, elapsed)
+                if history is not None:
+                    record_win(history, n, result)
+                return result
+            # Tổ hợp lỗi (Ex: solver không có trong bản pysat đang dùng): chạy tổ hợp tiếp theo
+            if len(running) < len(combos):
+                launch()
+        return None
+    finally:
+        for process in running:
+            if process.is_alive():
+                process.terminate()
+        for process in running:
+            process.join()
+
+def record_win(path, n, result):
+    with open(path, "a") as f:
+        f.write(json.dumps({"n": n, "encoding": result.encoding, "solver": result.solver,
+                            "time": result.time}) + "\n")
+
+# PARAMETERS:
+#   n: kích thước bàn cờ cần chọn
+#   history: file JSON lines do solve_portfolio ghi ra
+# RETURN: (encoding, solver) thắng nhiều nhất ở n gần nhất có trong lịch sử
+#         (hoà thì chọn tổ hợp có thời gian trung bình nhỏ hơn), hoặc None nếu chưa có lịch sử
+def best_combination(n, history):
+    if not os.path.exists(history):
+        return None
+    with open(history) as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    if not records:
+        return None
+
+    nearest = min(abs(r["n"] - n) for r in records)
+    wins = {}
+    for r in records:
+        if abs(r["n"] - n) == nearest:
+            wins.setdefault((r["encoding"], r["solver"]), []).append(r["time"])
+    return min(wins, key=lambda combo: (-len(wins[combo]), sum(wins[combo]) / len(wins[combo])))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Giải N-Queens bằng portfolio encoding x solver chạy song song.")
+    parser.add_argument("n", type=int, help="kích thước bàn cờ")
+    parser.add_argument("--encodings", nargs="+", default=list(DEFAULT_ENCODINGS), choices=sorted(ENCODINGS))
+    parser.add_argument("--solvers", nargs="+", default=list(DEFAULT_SOLVERS))
+    parser.add_argument("--workers", type=int, help="số process chạy cùng lúc (mặc định: số CPU)")
+    parser.add_argument("--timeout", type=float)
+    parser.add_argument("--history", help="file JSON lines ghi lại tổ hợp thắng")
+    args = parser.parse_args(argv)
+
+    result = solve_portfolio(args.n, args.encodings, args.solvers, args.workers, args.timeout, args.history)
+    if result is None:
+        print("No result within the time limit.")
+        return
+    print("Winner: %s + %s (%.3fs)" % (result.encoding, result.solver, result.time))
+    print_solution(result.solution)
+
+
+if __name__ == "__main__":
+    main()
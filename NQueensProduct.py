@@ -1,13 +1,7 @@
 ﻿import math
-from pysat.solvers import Glucose3
+from NQueensCore import generate_variables, at_least_one, make_encoding, generate_clauses as generate_clauses_core, solve_with_encoding, print_solution
 
 # Ký tự: ∨
-# Sinh biến cho bảng cờ N-Queens
-def generate_variables(n):
-    return [[i * n + j + 1 for j in range(n)] for i in range(n)]
-
-def at_least_one(clauses, variables):
-    clauses.append(variables)
 
 #RETURN: trả về next_aux_var sau khi đã cấp phát các biến phụ.
 def product_amo(clauses, variables, next_aux_var):
@@ -59,70 +53,84 @@ def exactly_one_product(clauses, variables, next_aux_var):
     next_aux_var = product_amo(clauses, variables, next_aux_var)
     return next_aux_var
 
+PRODUCT = make_encoding(exactly_one_product, product_amo)
+
+# Dưới số biến này, nested_product_amo dùng binomial thay vì chia lưới tiếp
+NESTED_PRODUCT_BASE = 4
+
+# Kiểm tra tham số của nested_product
+def check_nested_product(depth, dims):
+    if depth < 0:
+        raise ValueError("Nested product depth must be >= 0, got %r" % (depth,))
+    if dims < 1:
+        raise ValueError("Nested product dims must be >= 1, got %r" % (dims,))
+
+# PARAMETERS:
+#   clauses, variables, next_aux_var: như product_amo
+#   depth: số tầng product; tầng cuối dùng binomial cho các biến toạ độ (depth = 1, dims = 2 tương tự product_amo)
+#   dims: số chiều của lưới (k-product), dims = 2 là product thông thường
+# RETURN: trả về next_aux_var sau khi đã cấp phát các biến phụ.
+def nested_product_amo(clauses, variables, next_aux_var, depth=2, dims=2):
+    """
+    Các bước:
+      - Nếu depth = 0 hoặc m ≤ NESTED_PRODUCT_BASE: AMO theo binomial.
+      - Chọn cạnh s nhỏ nhất với s^dims ≥ m; biến variables[i] có toạ độ là các chữ số của i trong cơ số s.
+      - Với mỗi chiều d, tạo một biến phụ cho mỗi giá trị toạ độ đang dùng và thêm (-variables[i] ∨ toạ_độ_d[chữ_số_d(i)]).
+      - Ràng buộc AMO trên các biến toạ độ của từng chiều bằng nested_product_amo với depth - 1.
+      Hai biến TRUE khác nhau khác toạ độ ở ít nhất một chiều, nên chiều đó có hai biến toạ độ TRUE.
+    depth phải ≥ 0 và dims ≥ 1 (với dims = 0 không có cạnh s nào thoả s^dims ≥ m).
+    """
+    check_nested_product(depth, dims)
+    m = len(variables)
+    if depth <= 0 or m <= NESTED_PRODUCT_BASE:
+        for i in range(m):
+            for j in range(i + 1, m):
+                clauses.append([-variables[i], -variables[j]])
+        return next_aux_var
+
+    s = 2
+    while s ** dims < m:
+        s += 1
+    coords = []
+    for d in range(dims):
+        used = min(s, -(-m // s ** d))     # số giá trị toạ độ thực sự xuất hiện ở chiều d
+        coords.append(list(range(next_aux_var, next_aux_var + used)))
+        next_aux_var += used
+
+    for i, x in enumerate(variables):
+        digits = i
+        for d in range(dims):
+            clauses.append([-x, coords[d][digits % s]])
+            digits //= s
+
+    for coord_vars in coords:
+        next_aux_var = nested_product_amo(clauses, coord_vars, next_aux_var, depth - 1, dims)
+    return next_aux_var
+
+# RETURN: Encoding dùng nested_product_amo (cùng depth, dims) cho hàng, cột và đường chéo
+def nested_product_encoding(depth=2, dims=2):
+    check_nested_product(depth, dims)
+
+    def at_most_one(clauses, variables, next_aux_var):
+        return nested_product_amo(clauses, variables, next_aux_var, depth, dims)
+
+    def exactly_one(clauses, variables, next_aux_var):
+        at_least_one(clauses, variables)
+        return at_most_one(clauses, variables, next_aux_var)
+
+    return make_encoding(exactly_one, at_most_one)
+
 # RETURN: Trả về các mệnh đề phù hợp để giả NQueens (clauses) 
 #         và ID biến tiếp theo sau khi đã cấp phát các biến phụ (next_aux_var)
 def generate_clauses(n, board):
-    clauses = []
-
-    # Các biến đã được tạo từ 1 đến n*n, do đó next_aux_var khởi đầu là n*n + 1.
-    next_aux_var = n * n + 1 
-    
-    # Hàng: mỗi hàng phải có chính xác 1 queen.
-    for i in range(n):
-        row_vars = board[i]
-        next_aux_var = exactly_one_product(clauses, row_vars, next_aux_var)
-    
-    # Cột: mỗi cột có Exactly one queen.
-    for j in range(n):
-        col_vars = [board[i][j] for i in range(n)]
-        next_aux_var = exactly_one_product(clauses, col_vars, next_aux_var)
-    
-    # Đường chéo chính (xuống phải) và đường chéo phụ (xuống trái).
-    for i in range(n):
-        for j in range(n):
-            diag1 = []
-            diag2 = []
-            for k in range(1, n):
-                if i + k < n and j + k < n:
-                    diag1.append(board[i+k][j+k])
-                if i + k < n and j - k >= 0:
-                    diag2.append(board[i+k][j-k])
-            if len(diag1) > 1:
-                next_aux_var = product_amo(clauses, diag1, next_aux_var)
-            if len(diag2) > 1:
-                next_aux_var = product_amo(clauses, diag2, next_aux_var)
-    
-    return clauses, next_aux_var
+    return generate_clauses_core(n, board, PRODUCT)
 
 # Hàm giải N-Queens sử dụng Product Encoding
 def solve_nqueens_product(n):
-    board = generate_variables(n)
-    clauses, _ = generate_clauses(n, board)
-    
-    solver = Glucose3()
-    for cl in clauses:
-        solver.add_clause(cl)
-    
-    if solver.solve():
-        model = solver.get_model()
-        solution = [[0]*n for _ in range(n)]
-        for i in range(n):
-            for j in range(n):
-                if board[i][j] in model:
-                    solution[i][j] = 1
-        return solution
-    else:
-        return None
-
-def print_solution(solution):
-    if solution is None:
-        print("No solution found.")
-    else:
-        for row in solution:
-            print(" ".join("Q" if cell else "." for cell in row))
-
-
-n = 4  # Thay đổi kích thước theo ý muốn
-solution = solve_nqueens_product(n)
-print_solution(solution)
+    return solve_with_encoding(n, PRODUCT)
+
 
+if __name__ == "__main__":
+    n = 4  # Thay đổi kích thước theo ý muốn
+    solution = solve_nqueens_product(n)
+    print_solution(solution)
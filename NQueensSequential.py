@@ -1,10 +1,7 @@
 ﻿import math
-from pysat.solvers import Glucose3
+from NQueensCore import generate_variables, at_least_one, make_encoding, generate_clauses, solve_with_encoding, print_solution
 
 # Ký tự: ∨
-# Sinh biến cho bảng cờ N-Queens
-def generate_variables(n):
-    return [[i * n + j + 1 for j in range(n)] for i in range(n)]
 
 # PARAMETERS: 
 #   clauses: danh sách các mệnh đề đang có
@@ -22,6 +19,9 @@ def at_most_one_seq(clauses, variables, next_aux_var):
       - (¬x_n ∨ ¬s_{n-1})
     """
     n = len(variables)
+    # Với 1 biến thì không cần ràng buộc gì.
+    if n < 2:
+        return next_aux_var
     # Tạo các biến phụ s_1, ..., s_{n-1} với ID từ next_aux_var đến next_aux_var + n - 2.
     s_vars = list(range(next_aux_var, next_aux_var + n - 1))
     next_aux_var_updated = next_aux_var + n - 1
@@ -43,80 +43,24 @@ def at_most_one_seq(clauses, variables, next_aux_var):
 
     return next_aux_var_updated
 
-def at_least_one(clauses, variables):
-    clauses.append(variables)
-
 def exactly_one_seq(clauses, variables, next_aux_var):
     at_least_one(clauses, variables)
     next_aux_var = at_most_one_seq(clauses, variables, next_aux_var)
     return next_aux_var
 
+SEQUENTIAL = make_encoding(exactly_one_seq, at_most_one_seq)
+
 # RETURN: Trả về các mệnh đề phù hợp để giả NQueens (clauses) 
 #         và ID biến tiếp theo sau khi đã cấp phát các biến phụ (next_aux_var)
-
 def generate_clauses_seq(n, board):
-    clauses = []
-
-    # Các biến trên board được tạo từ 1 đến n*n, do đó biến tiếp theo:
-    next_aux_var = n * n + 1
-
-    # Hàng: mỗi hàng có Exactly one queen.
-    for i in range(n):
-        row_vars = board[i]
-        next_aux_var = exactly_one_seq(clauses, row_vars, next_aux_var)
-
-    # Cột: mỗi cột có Exactly one queen.
-    for j in range(n):
-        col_vars = [board[i][j] for i in range(n)]
-        next_aux_var = exactly_one_seq(clauses, col_vars, next_aux_var)
-
-    # Đường chéo chính (xuống phải) và đường chéo phụ (xuống trái).
-    for i in range(n):
-        for j in range(n):
-            diag1 = []
-            diag2 = []
-            for k in range(1, n):
-                if i + k < n and j + k < n:
-                    diag1.append(board[i + k][j + k])
-                if i + k < n and j - k >= 0:
-                    diag2.append(board[i + k][j - k])
-            if len(diag1) > 1:
-                next_aux_var = at_most_one_seq(clauses, diag1, next_aux_var)
-            if len(diag2) > 1:
-                next_aux_var = at_most_one_seq(clauses, diag2, next_aux_var)
-
-    return clauses, next_aux_var
+    return generate_clauses(n, board, SEQUENTIAL)
 
 # Hàm giải N-Queens sử dụng Sequential Counter Encoding
 def solve_nqueens_seq(n):
-    board = generate_variables(n)  # Ma trận bàn cờ n x n
-    clauses, _ = generate_clauses_seq(n, board)
-
-    solver = Glucose3()
-    for cl in clauses:
-        solver.add_clause(cl)
-
-    if solver.solve():
-        model = solver.get_model()
-        solution = [[0]*n for _ in range(n)]
-        for i in range(n):
-            for j in range(n):
-                var_id = board[i][j]
-                if var_id in model:
-                    solution[i][j] = 1
-        return solution
-    else:
-        return None
-
-def print_solution(solution):
-    if solution is None:
-        print("No solution found.")
-    else:
-        for row in solution:
-            print(" ".join("Q" if cell else "." for cell in row))
-
+    return solve_with_encoding(n, SEQUENTIAL)
 
-n = 4  # Thay đổi kích thước theo ý muốn
-solution = solve_nqueens_seq(n)
-print_solution(solution)
 
+if __name__ == "__main__":
+    n = 4  # Thay đổi kích thước theo ý muốn
+    solution = solve_nqueens_seq(n)
+    print_solution(solution)
@@ -0,0 +1,271 @@
+﻿import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from NQueensBatch import _init_worker, solve_instance
+
+# Dịch vụ giải N-Queens qua HTTP (TCP hoặc Unix socket) dựng trên asyncio.
+#   POST /solve   body JSON giống một dòng của NQueensBatch: {"n": 8, "placed": [[0, 0]], "encoding": "sequential", "timeout": 2}
+#                 trả về kết quả giống NQueensBatch.solve_instance, thêm "source": "solver" | "cache" | "coalesced"
+#   GET  /stats   số truy vấn, cache hit, số truy vấn được gộp, số lần gọi solver
+#   GET  /health
+# Việc giải chạy trên một pool process (mỗi worker giữ các phiên NQueensSession đang mở),
+# các truy vấn giống nhau đang chờ được gộp thành một lần giải, kết quả SAT/UNSAT được giữ trong cache LRU.
+# Timeout của truy vấn tính cả việc mở phiên (sinh công thức) trong worker. Nếu một worker chết
+# (hết bộ nhớ, lỗi trong solver), pool được tạo lại và truy vấn được thử lại một lần.
+
+DEFAULT_TIMEOUT = 10.0
+
+# n lớn nhất được nhận mặc định: công thức cho n lớn chiếm một worker rất lâu và có thể làm nó hết bộ nhớ
+DEFAULT_MAX_N = 1000
+
+# Thời gian chờ thêm (giây) sau timeout của truy vấn trước khi trả về TIMEOUT mà không đợi worker
+# (worker tự ngắt solver bằng interrupt, khoảng này chỉ phòng khi worker bị kẹt ở bước khác)
+TIMEOUT_GRACE = 1.0
+
+MAX_BODY = 1 << 20
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large",
+           500: "Internal Server Error"}
+
+class NQueensService:
+    """
+    PARAMETERS:
+      workers: số process giải, mặc định bằng số CPU
+      cache_size: số kết quả tối đa trong cache LRU
+      max_sessions: số phiên giải tối đa mỗi worker giữ cùng lúc
+      default_timeout: timeout (giây) khi truy vấn không chỉ định
+      max_n: n lớn nhất được nhận, truy vấn lớn hơn bị trả về 400
+    """
+
+    def __init__(self, workers=None, cache_size=4096, max_sessions=4, default_timeout=DEFAULT_TIMEOUT,
+                 max_n=DEFAULT_MAX_N):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_sessions = max_sessions
+        self.executor = self._make_executor()
+        self.cache = OrderedDict()
+        self.cache_size = cache_size
+        self.default_timeout = default_timeout
+        self.max_n = max_n
+        self.inflight = {}
+        self.counters = {"requests": 0, "cache_hits": 0, "coalesced": 0, "solver_calls": 0, "timeouts": 0,
+                         "pool_restarts": 0}
+        self.servers = []
+
+    def _make_executor(self):
+        # Không dùng fork: process con tạo bằng fork sau khi đã accept kết nối sẽ giữ lại socket của client,
+        # kết nối không được đóng thật khi server gọi writer.close()
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        return ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context(method),
+                                   initializer=_init_worker, initargs=(self.max_sessions,))
+
+    # RETURN: khoá của truy vấn (n, encoding, các hậu đặt sẵn đã sắp xếp); id và timeout không ảnh hưởng kết quả
+    def key(self, request):
+        if not isinstance(request, dict):
+            raise TypeError("request must be a JSON object, got %s" % (type(request).__name__,))
+        n = int(request["n"])
+        if not 1 <= n <= self.max_n:
+            raise ValueError("n must be between 1 and %d, got %d" % (self.max_n, n))
+        placed = tuple(sorted((int(r), int(c)) for r, c in request.get("placed", ())))
+        return n, str(request.get("encoding", "sequential")), placed
+
+    # RETURN: timeout (giây, float) của truy vấn, None là không giới hạn
+    def timeout(self, request):
+        timeout = request.get("timeout", self.default_timeout)
+        if timeout is None:
+            return None
+        if isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or not timeout >= 0:
+            raise ValueError("timeout must be a non-negative number or null, got %r" % (timeout,))
+        return float(timeout)
+
+    # RETURN: dict kết quả (không gồm id) cho truy vấn, gọi solver nhiều nhất một lần cho các truy vấn giống nhau.
+    #         Truy vấn chỉ được gộp vào lần giải đang chạy có timeout không ngắn hơn timeout của nó,
+    #         để không nhận TIMEOUT của một truy vấn khác có timeout ngắn hơn.
+    async def solve(self, request):
+        self.counters["requests"] += 1
+        key = self.key(request)
+        timeout = self.timeout(request)
+
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            self.counters["cache_hits"] += 1
+            return dict(self.cache[key], source="cache")
+
+        if key in self.inflight:
+            inflight, inflight_timeout = self.inflight[key]
+            if inflight_timeout is None or (timeout is not None and timeout <= inflight_timeout):
+                self.counters["coalesced"] += 1
+                result = await asyncio.shield(inflight)
+                return dict(result, source="coalesced")
+
+        # Truy vấn mới (hoặc timeout dài hơn lần giải đang chạy): các truy vấn sau sẽ gộp vào lần giải này
+        future = asyncio.get_running_loop().create_future()
+        self.inflight[key] = (future, timeout)
+        try:
+            result = await self._run(key, timeout)
+            future.set_result(result)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()      # các truy vấn gộp nhận lỗi, tránh cảnh báo "exception never retrieved"
+            raise
+        finally:
+            if self.inflight.get(key, (None,))[0] is future:
+                del self.inflight[key]
+
+        if result["status"] in ("SAT", "UNSAT"):
+            self.cache[key] = result
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        return dict(result, source="solver")
+
+    async def _run(self, key, timeout):
+        n, encoding, placed = key
+        instance = {"n": n, "encoding": encoding, "placed": [list(p) for p in placed]}
+        if timeout is not None:
+            instance["timeout"] = timeout
+        self.counters["solver_calls"] += 1
+
+        for retry in (False, True):
+            executor = self.executor
+            try:
+                # submit ném BrokenProcessPool ngay nếu pool đã hỏng từ trước
+                call = asyncio.get_running_loop().run_in_executor(executor, solve_instance, instance)
+                result = await asyncio.wait_for(call, None if timeout is None else timeout + TIMEOUT_GRACE)
+                break
+            except asyncio.TimeoutError:
+                result = {"n": n, "status": "TIMEOUT"}
+                break
+            except BrokenProcessPool:
+                # Một worker đã chết: pool này không dùng được nữa, tạo pool mới (một lần cho mọi truy vấn
+                # cùng gặp lỗi) rồi thử lại; lần thử lại vẫn lỗi thì chỉ truy vấn này nhận lỗi 500
+                if self.executor is executor:
+                    self.executor = self._make_executor()
+                    self.counters["pool_restarts"] += 1
+                    executor.shutdown(wait=False, cancel_futures=True)
+                if retry:
+                    raise
+        result.pop("id", None)
+        if result["status"] == "TIMEOUT":
+            self.counters["timeouts"] += 1
+        return result
+
+    # Xử lý một kết nối HTTP/1.1 (hỗ trợ keep-alive)
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get("content-length", 0))
+                if length > MAX_BODY:
+                    await self._respond(writer, 413, {"error": "request body too large"}, False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+                keep_alive = headers.get("connection", "").lower() != "close"
+
+                status, payload = await self.route(method, path, body)
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    # RETURN: (mã HTTP, dict JSON trả về)
+    async def route(self, method, path, body):
+        path = path.split("?", 1)[0]
+        if path == "/health":
+            return 200, {"status": "ok"}
+        if path == "/stats":
+            return 200, dict(self.counters, cache_size=len(self.cache), inflight=len(self.inflight))
+        if path != "/solve":
+            return 404, {"error": "unknown path %s" % (path,)}
+        if method != "POST":
+            return 405, {"error": "use POST /solve"}
+        try:
+            request = json.loads(body)
+            self.key(request)
+            self.timeout(request)
+        except (ValueError, KeyError, TypeError) as e:
+            return 400, {"error": "invalid request: %s" % (e,)}
+
+        start = time.perf_counter()
+        try:
+            result = await self.solve(request)
+        except Exception as e:      # Ex: worker bị crash (BrokenProcessPool)
+            return 500, {"id": request.get("id"), "status": "ERROR", "error": repr(e)}
+        result.update(id=request.get("id"), time=time.perf_counter() - start)
+        return 200, result
+
+    async def _respond(self, writer, status, payload, keep_alive):
+        data = json.dumps(payload).encode()
+        writer.write(("HTTP/1.1 %d %s\r\nContent-Type: application/json\r\nContent-Length: %d\r\nConnection: %s\r\n\r\n"
+                      % (status, REASONS[status], len(data), "keep-alive" if keep_alive else "close")).encode("latin-1"))
+        writer.write(data)
+        await writer.drain()
+
+    # Mở cổng TCP (host, port) và/hoặc Unix socket (unix)
+    async def start(self, host="127.0.0.1", port=8080, unix=None):
+        if port is not None:
+            self.servers.append(await asyncio.start_server(self.handle, host, port))
+        if unix is not None:
+            self.servers.append(await asyncio.start_unix_server(self.handle, unix))
+        return self.servers
+
+    async def close(self):
+        for server in self.servers:
+            server.close()
+            await server.wait_closed()
+        self.servers = []
+        self.executor.shutdown(cancel_futures=True)
+
+async def serve(args):
+    service = NQueensService(args.workers, args.cache_size, args.max_sessions, args.timeout, args.max_n)
+    port = None if args.unix and args.port is None else (args.port or 8080)
+    servers = await service.start(args.host, port, args.unix)
+    for server in servers:
+        for sock in server.sockets:
+            print("Listening on %s" % (sock.getsockname(),))
+    try:
+        await asyncio.gather(*(server.serve_forever() for server in servers))
+    finally:
+        await service.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Dịch vụ HTTP giải N-Queens (asyncio + pool process).")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, help="cổng TCP (mặc định 8080, không mở nếu chỉ dùng --unix)")
+    parser.add_argument("--unix", help="đường dẫn Unix socket")
+    parser.add_argument("--workers", type=int, help="số process giải (mặc định: số CPU)")
+    parser.add_argument("--cache-size", type=int, default=4096)
+    parser.add_argument("--max-sessions", type=int, default=4, help="số phiên giải tối đa mỗi worker giữ cùng lúc")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="timeout mặc định mỗi truy vấn (giây)")
+    parser.add_argument("--max-n", type=int, default=DEFAULT_MAX_N, help="n lớn nhất được nhận (lớn hơn trả về 400)")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
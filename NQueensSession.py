@@ -0,0 +1,88 @@
+﻿import threading
+from collections import namedtuple
+from pysat.solvers import Solver
+
+from NQueensCore import load_clauses, decode_model
+from NQueensStats import NO_STATS
+
+# Phiên giải cố định theo n: công thức được mã hoá một lần, mỗi truy vấn "hoàn thiện bàn cờ
+# có sẵn một số hậu" chỉ gọi solver.solve(assumptions=...) trên cùng solver, không dựng lại mệnh đề.
+
+# Kết quả một truy vấn:
+#   - solution: Solution nếu hoàn thiện được, ngược lại None
+#   - conflict: danh sách (row, col) các hậu đặt sẵn mâu thuẫn nhau (lấy từ get_core), rỗng nếu SAT,
+#               None nếu hết thời gian (timeout) trước khi solver kết luận
+Completion = namedtuple("Completion", ["solution", "conflict"])
+
+class NQueensSession:
+    # solver_name: solver của pysat; khi dùng timeout nên chọn solver kiểm tra interrupt thường xuyên
+    #              (Ex: minisat22), Glucose chỉ kiểm tra khi restart nên có thể chạy quá timeout rất lâu
+    # stats: SolveStats (NQueensStats) tuỳ chọn nhận thời gian sinh và nạp công thức
+    # deadline: mốc time.perf_counter(); quá mốc khi đang sinh công thức thì giải phóng solver và ném TimeoutError
+    def __init__(self, n, encoding, solver_name="glucose3", stats=None, deadline=None):
+        self.n = n
+        self.solver = Solver(name=solver_name)
+        try:
+            self.board, _ = load_clauses(self.solver, n, encoding, stats=stats, deadline=deadline)
+        except BaseException:
+            self.close()
+            raise
+
+    # PARAMETERS:
+    #   placed: danh sách (row, col) các hậu đặt sẵn (đánh số từ 0)
+    #   timeout: thời gian tối đa (giây); hết thời gian thì solver bị ngắt bằng interrupt (solve_limited)
+    #   stats: SolveStats (NQueensStats) tuỳ chọn cho truy vấn này: các pha assume, solve, decode / core;
+    #          accum_stats là số liệu cộng dồn của solver từ khi mở phiên
+    # RETURN: Completion
+    def complete(self, placed=(), timeout=None, stats=None):
+        stats = stats or NO_STATS
+        stats.record(n=self.n, backend="session", placed=len(placed), timeout=timeout)
+        with stats.phase("assume"):
+            assumptions = self.assumptions(placed)
+
+        with stats.phase("solve"):
+            if timeout is None:
+                sat = self.solver.solve(assumptions=assumptions)
+            else:
+                timer = threading.Timer(timeout, self.solver.interrupt)
+                timer.start()
+                try:
+                    sat = self.solver.solve_limited(assumptions=assumptions, expect_interrupt=True)
+                finally:
+                    timer.cancel()
+                    self.solver.clear_interrupt()
+        stats.solver_stats(self.solver)
+
+        if sat is None:
+            stats.finish(None, "UNKNOWN")
+            return Completion(None, None)
+        if sat:
+            with stats.phase("decode"):
+                solution = decode_model(self.solver.get_model(), self.n)
+            stats.finish(solution)
+            return Completion(solution, [])
+
+        with stats.phase("core"):
+            core = self.solver.get_core() or []
+        stats.finish(None)
+        return Completion(None, [divmod(var - 1, self.n) for var in core])
+
+    # RETURN: ID biến của các hậu đặt sẵn, kiểm tra nằm trong bàn cờ
+    def assumptions(self, placed):
+        assumptions = []
+        for row, col in placed:
+            if not (0 <= row < self.n and 0 <= col < self.n):
+                raise ValueError("Queen (%d, %d) is outside the %dx%d board" % (row, col, self.n, self.n))
+            assumptions.append(self.board[row][col])
+        return assumptions
+
+    def close(self):
+        if self.solver is not None:
+            self.solver.delete()
+            self.solver = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
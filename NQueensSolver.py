@@ -0,0 +1,195 @@
+﻿import argparse
+import sys
+
+from NQueensCore import find_solution, solve_with_encoding, print_solution
+from NQueensBinomial import BINOMIAL
+from NQueensSequential import SEQUENTIAL
+from NQueensBinary import BINARY
+from NQueensProduct import PRODUCT, nested_product_encoding
+from NQueensCommander import commander_encoding, recursive_commander_encoding
+from NQueensBimander import bimander_encoding
+from NQueensLadder import LADDER
+from NewSequentialCounterEncoding import nsc_encoding
+from NQueensVectorized import find_solution_vectorized
+from NQueensBacktrack import find_solution_backtrack, iter_solutions_backtrack, count_solutions_backtrack
+from NQueensConstructive import find_solution_constructive
+from NQueensLocalSearch import find_solution_local
+from NQueensEnumerate import iter_solutions_sat, count_solutions_sat
+from NQueensSymmetry import is_canonical
+from NQueensSession import NQueensSession
+from NQueensNativeCard import CARD_TYPES, card_encoding, find_solution_native
+from NQueensHybrid import NAMES as HYBRID_NAMES, hybrid_encoding
+from NQueensStats import SolveStats
+
+# Danh sách các encoding có thể chọn, mỗi phần tử là hàm nhận tham số (nếu có) và trả về Encoding.
+ENCODINGS = {
+    "binomial": lambda: BINOMIAL,
+    "sequential": lambda: SEQUENTIAL,
+    "binary": lambda: BINARY,
+    "product": lambda: PRODUCT,
+    "commander": commander_encoding,
+    "bimander": bimander_encoding,
+    "ladder": lambda: LADDER,
+    "nested_product": nested_product_encoding,
+    "recursive_commander": recursive_commander_encoding,
+    # Solution chỉ biểu diễn 1 hậu mỗi hàng, nên ở đây chỉ nới diag_k;
+    # biến thể k hậu mỗi hàng dùng NewSequentialCounterEncoding.solve_nqueens_nsc.
+    "nsc": lambda diag_k=1: nsc_encoding(1, diag_k),
+    "card": card_encoding,
+    "hybrid": hybrid_encoding,
+}
+
+# Các backend giải: "sat" dùng encoding + Glucose3, "backtrack" dùng NQueensBacktrack,
+# "constructive" dựng lời giải theo công thức O(n) (NQueensConstructive),
+# "native" dùng ràng buộc bản số trực tiếp của Minicard/Gluecard (NQueensNativeCard),
+# "local" dùng tìm kiếm cục bộ min-conflicts (NQueensLocalSearch) cho n rất lớn; với n ≤ BACKTRACK_MAX_N
+# dùng backtrack để kết quả "không có lời giải" là chính xác.
+# "auto": nếu chỉ định encoding hoặc vectorized thì dùng sat; nếu không, backtrack khi
+# n ≤ BACKTRACK_MAX_N, còn lại constructive.
+BACKENDS = ("auto", "sat", "backtrack", "constructive", "native", "local")
+BACKTRACK_MAX_N = 16
+
+# PARAMETERS:
+#   name: tên encoding trong ENCODINGS
+#   params: tham số riêng của encoding (Ex: group_size cho commander)
+# RETURN: Encoding tương ứng
+def get_encoding(name, **params):
+    if name not in ENCODINGS:
+        raise ValueError("Unknown encoding %r, expected one of: %s" % (name, ", ".join(ENCODINGS)))
+    return ENCODINGS[name](**params)
+
+# Hàm giải N-Queens
+#   encoding: tên encoding cho backend sat (mặc định sequential)
+#   backend: một trong BACKENDS
+#   vectorized: sinh mệnh đề bằng NumPy (NQueensVectorized), chỉ có cho binomial và product (mặc định product)
+#   solver_name: solver của pysat (Ex: "cadical195"), mặc định glucose3 cho sat và minicard cho native
+#   stats: SolveStats (NQueensStats) nhận thời gian từng pha, kích thước công thức, accum_stats và RSS đỉnh
+#   seed: hạt giống cho backend local
+# RETURN: Solution (vector cột queens, ma trận board) nếu có lời giải, ngược lại None
+#         (với local và n > BACKTRACK_MAX_N, None chỉ có nghĩa là không tìm thấy trong giới hạn)
+def solve(n, encoding=None, backend="auto", vectorized=False, solver_name=None, stats=None, seed=None, **params):
+    if backend == "auto":
+        if encoding is not None or vectorized:
+            backend = "sat"
+        else:
+            backend = "backtrack" if n <= BACKTRACK_MAX_N else "constructive"
+    if backend == "backtrack":
+        return find_solution_backtrack(n, stats)
+    if backend == "constructive":
+        return find_solution_constructive(n, stats)
+    if backend == "native":
+        return find_solution_native(n, solver_name or "minicard", stats)
+    if backend == "local":
+        if n <= BACKTRACK_MAX_N:
+            return find_solution_backtrack(n, stats)
+        return find_solution_local(n, seed=seed, stats=stats)
+    if backend != "sat":
+        raise ValueError("Unknown backend %r, expected one of: %s" % (backend, ", ".join(BACKENDS)))
+
+    if vectorized:
+        # Mặc định product như find_solution_vectorized (sequential không có dạng NumPy)
+        return find_solution_vectorized(n, encoding or "product", stats, solver_name or "glucose3")
+    encoding = encoding or "sequential"
+    if stats:
+        stats.record(encoding=encoding, params=params)
+    return find_solution(n, get_encoding(encoding, **params), solver_name or "glucose3", stats)
+
+# Liệt kê lời giải
+#   backend: "auto" (backtrack nếu không chỉ định encoding), "sat" hoặc "backtrack"
+#   canonical_only: chỉ trả về một đại diện cho mỗi quỹ đạo đối xứng
+#   symmetry_breaking: với SAT, thêm ràng buộc lex-leader vào công thức thay vì chặn quỹ đạo sau mỗi lời giải;
+#                      với backtrack, giống canonical_only
+# RETURN: lần lượt từng Solution
+def iter_solutions(n, encoding=None, backend="auto", canonical_only=False, symmetry_breaking=False, stats=None,
+                   **params):
+    if backend == "auto":
+        backend = "backtrack" if encoding is None else "sat"
+    if backend == "backtrack":
+        solutions = iter_solutions_backtrack(n)
+        if canonical_only or symmetry_breaking:
+            solutions = (s for s in solutions if is_canonical(s.queens))
+        return solutions
+    if backend != "sat":
+        raise ValueError("Backend %r cannot enumerate solutions, expected one of: auto, sat, backtrack" % (backend,))
+    return iter_solutions_sat(n, get_encoding(encoding or "sequential", **params), canonical_only, symmetry_breaking,
+                              stats=stats)
+
+# RETURN: số lời giải của bàn cờ n x n
+def count_solutions(n, encoding=None, backend="auto", canonical_only=False, symmetry_breaking=False, stats=None,
+                    **params):
+    if backend == "auto":
+        backend = "backtrack" if encoding is None else "sat"
+    if backend == "backtrack":
+        return count_solutions_backtrack(n)
+    if backend != "sat":
+        raise ValueError("Backend %r cannot count solutions, expected one of: auto, sat, backtrack" % (backend,))
+    return count_solutions_sat(n, get_encoding(encoding or "sequential", **params), canonical_only, symmetry_breaking,
+                               stats)
+
+# Mở phiên giải cho n cố định để trả lời nhiều truy vấn hoàn thiện bàn cờ (NQueensSession.complete)
+def open_session(n, encoding="sequential", solver_name="glucose3", stats=None, deadline=None, **params):
+    return NQueensSession(n, get_encoding(encoding, **params), solver_name, stats, deadline)
+
+# RETURN: ma trận bàn cờ 0/1 nếu SATISFIABLE, ngược lại None
+def solve_nqueens(n, encoding="sequential", stats=None, **params):
+    return solve_with_encoding(n, get_encoding(encoding, **params), stats)
+
+def group_size_arg(value):
+    return value if value == "auto" else int(value)
+
+# Thêm các tham số dòng lệnh riêng của từng encoding (dùng chung với NQueensDimacs export)
+def add_encoding_arguments(parser):
+    parser.add_argument("--group-size", type=group_size_arg, default=3, help="kích thước nhóm cho commander (số hoặc auto)")
+    parser.add_argument("--bimander-group-size", type=int, default=2, help="kích thước nhóm cho bimander")
+    parser.add_argument("--depth", type=int, help="số tầng cho nested_product (mặc định 2) và recursive_commander (mặc định không giới hạn)")
+    parser.add_argument("--dims", type=int, default=2, help="số chiều lưới cho nested_product")
+    parser.add_argument("--threshold", type=int, default=6, help="hybrid: đường ngắn hơn threshold dùng --small, còn lại dùng --large")
+    parser.add_argument("--small", default="binomial", choices=HYBRID_NAMES)
+    parser.add_argument("--large", default="product", choices=HYBRID_NAMES)
+    parser.add_argument("--card", default="seqcounter", choices=sorted(CARD_TYPES), help="kiểu mã hoá cho card encoding")
+
+# RETURN: tham số cho get_encoding(args.encoding, **params) lấy từ các tham số của add_encoding_arguments
+def encoding_params(args):
+    params = {}
+    if args.encoding == "commander":
+        params["group_size"] = args.group_size
+    if args.encoding == "bimander":
+        params["group_size"] = args.bimander_group_size
+    if args.encoding == "nested_product":
+        params.update(depth=2 if args.depth is None else args.depth, dims=args.dims)
+    if args.encoding == "recursive_commander":
+        params.update(group_size=args.group_size, depth=args.depth)
+    if args.encoding == "card":
+        params["card"] = args.card
+    if args.encoding == "hybrid":
+        params.update(threshold=args.threshold, small=args.small, large=args.large, group_size=args.group_size)
+    return params
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Giải bài toán N-Queens bằng SAT solver.")
+    parser.add_argument("n", type=int, help="kích thước bàn cờ")
+    parser.add_argument("--encoding", choices=sorted(ENCODINGS), help="encoding cho SAT (mặc định sequential)")
+    parser.add_argument("--backend", default="auto", choices=BACKENDS)
+    add_encoding_arguments(parser)
+    parser.add_argument("--solver", help="solver của pysat (Ex: glucose4, cadical195, minicard)")
+    parser.add_argument("--vectorized", action="store_true", help="sinh mệnh đề bằng NumPy (binomial, product; mặc định product)")
+    parser.add_argument("--count", action="store_true", help="đếm tất cả lời giải")
+    parser.add_argument("--canonical", action="store_true", help="khi đếm bằng SAT, chỉ liệt kê một đại diện cho mỗi quỹ đạo đối xứng")
+    parser.add_argument("--symmetry-breaking", action="store_true",
+                        help="khi đếm bằng SAT, thêm ràng buộc lex-leader để loại các lời giải đối xứng ngay trong công thức")
+    parser.add_argument("--seed", type=int, help="hạt giống cho backend local")
+    parser.add_argument("--stats", action="store_true", help="ghi thống kê từng pha (JSON lines) ra stderr")
+    args = parser.parse_args(argv)
+
+    params = encoding_params(args)
+    stats = SolveStats(out=sys.stderr) if args.stats else None
+    if args.count:
+        print(count_solutions(args.n, args.encoding, args.backend, args.canonical,
+                              args.symmetry_breaking, stats, **params))
+        return
+    print_solution(solve(args.n, args.encoding, args.backend, args.vectorized, args.solver, stats, args.seed,
+                         **params))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+﻿import json
+import sys
+import time
+
+try:
+    import resource
+except ImportError:     # Windows
+    resource = None
+
+# Thống kê cho một lần giải, dùng chung cho mọi hàm find_solution_* / NQueensSolver.solve (tham số stats).
+# Mỗi pha (variables, encode, load, solve, decode, search, ...) ghi lại thời gian thực (wall) và thời gian CPU.
+# Khi không truyền stats, các hàm giải dùng NO_STATS: mọi phương thức đều không làm gì và không đo thời gian,
+# nên có thể để sẵn trong code chạy thật.
+
+# RETURN: bộ nhớ RSS đỉnh (byte) của process từ lúc khởi động, None nếu hệ điều hành không hỗ trợ
+def peak_rss():
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024     # Linux trả về KB, macOS trả về byte
+
+# Một pha đang đo. Thời gian của pha lồng bên trong được trừ khỏi pha bên ngoài,
+# nên tổng thời gian các pha bằng thời gian của cả lần giải (Ex: load nằm trong encode khi nạp theo luồng).
+class _Phase:
+    __slots__ = ("stats", "name", "wall", "cpu")
+
+    def __init__(self, stats, name):
+        self.stats = stats
+        self.name = name
+
+    def __enter__(self):
+        self.stats._stack.append(self)
+        self.wall = time.perf_counter()
+        self.cpu = time.process_time()
+        return self
+
+    def __exit__(self, *exc):
+        wall = time.perf_counter() - self.wall
+        cpu = time.process_time() - self.cpu
+        stack = self.stats._stack
+        stack.pop()
+        self.stats.add_time(self.name, wall, cpu)
+        if stack:
+            self.stats.add_time(stack[-1].name, -wall, -cpu)
+        return False
+
+class SolveStats:
+    """
+    Các trường:
+      - info: mô tả lần giải (n, backend, encoding, solver, status, ...)
+      - phases: {tên pha: {"wall": giây, "cpu": giây}} theo thứ tự bắt đầu
+      - counts: kích thước công thức (clauses, variables, aux_vars)
+      - solver: accum_stats của solver (conflicts, decisions, propagations, restarts)
+      - peak_rss: RSS đỉnh (byte) khi kết thúc
+    out (tuỳ chọn): file văn bản, mỗi lần finish ghi thêm một dòng JSON (JSON lines).
+    """
+    __slots__ = ("info", "phases", "counts", "solver", "peak_rss", "out", "_stack")
+
+    def __init__(self, out=None, **info):
+        self.info = info
+        self.phases = {}
+        self.counts = {}
+        self.solver = {}
+        self.peak_rss = None
+        self.out = out
+        self._stack = []
+
+    def __bool__(self):
+        return True
+
+    # Dùng với with: with stats.phase("encode"): ...
+    def phase(self, name):
+        return _Phase(self, name)
+
+    def add_time(self, name, wall, cpu):
+        times = self.phases.get(name)
+        if times is None:
+            times = self.phases[name] = {"wall": 0.0, "cpu": 0.0}
+        times["wall"] += wall
+        times["cpu"] += cpu
+
+    def record(self, **info):
+        self.info.update(info)
+
+    def count(self, **counts):
+        self.counts.update(counts)
+
+    def solver_stats(self, solver):
+        self.solver.update(solver.accum_stats() or {})
+
+    # Kết thúc lần giải: ghi status (SAT / UNSAT theo solution, hoặc status nếu chỉ định, Ex: UNKNOWN khi hết
+    # giới hạn), RSS đỉnh và xuất một dòng JSON nếu có out
+    def finish(self, solution, status=None):
+        self.info["status"] = status or ("SAT" if solution is not None else "UNSAT")
+        self.peak_rss = peak_rss()
+        if self.out is not None:
+            self.emit(self.out)
+
+    @property
+    def wall_time(self):
+        return sum(times["wall"] for times in self.phases.values())
+
+    @property
+    def cpu_time(self):
+        return sum(times["cpu"] for times in self.phases.values())
+
+    def to_dict(self):
+        return {"info": self.info, "phases": self.phases, "counts": self.counts, "solver": self.solver,
+                "peak_rss": self.peak_rss, "wall_time": self.wall_time, "cpu_time": self.cpu_time}
+
+    def emit(self, f):
+        f.write(json.dumps(self.to_dict()) + "\n")
+        f.flush()
+
+    def __repr__(self):
+        phases = ", ".join("%s=%.4fs" % (name, times["wall"]) for name, times in self.phases.items())
+        return "SolveStats(%s; %s)" % (", ".join("%s=%r" % item for item in self.info.items()), phases)
+
+class _NoPhase:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+# Thống kê rỗng dùng khi stats=None: không đo, không lưu gì
+class _NoStats:
+    __slots__ = ()
+    _phase = _NoPhase()
+
+    def __bool__(self):
+        return False
+
+    def phase(self, name):
+        return self._phase
+
+    def record(self, **info):
+        pass
+
+    def count(self, **counts):
+        pass
+
+    def solver_stats(self, solver):
+        pass
+
+    def finish(self, solution, status=None):
+        pass
+
+NO_STATS = _NoStats()
@@ -0,0 +1,104 @@
+﻿from NQueensCore import Solution
+
+# Đối xứng của bàn cờ (nhóm nhị diện 8 phần tử: 4 phép quay, có hoặc không lấy đối xứng gương)
+# trên lời giải dạng vector cột queens (queens[i] = cột của hậu ở hàng i).
+
+# Quay 90° theo chiều kim đồng hồ: ô (i, j) -> (j, n-1-i)
+def rotate(queens):
+    n = len(queens)
+    rotated = [0] * n
+    for i, j in enumerate(queens):
+        rotated[j] = n - 1 - i
+    return rotated
+
+# Đối xứng gương trái - phải: ô (i, j) -> (i, n-1-j)
+def mirror(queens):
+    n = len(queens)
+    return [n - 1 - j for j in queens]
+
+# RETURN: 8 ảnh của queens qua các phép đối xứng (có thể trùng nhau)
+def images(queens):
+    result = []
+    for q in (list(queens), mirror(queens)):
+        for _ in range(4):
+            result.append(q)
+            q = rotate(q)
+    return result
+
+# RETURN: tập các ảnh khác nhau (dạng tuple) của queens, kích thước là độ lớn quỹ đạo (1, 2, 4 hoặc 8)
+def orbit(queens):
+    return {tuple(q) for q in images(queens)}
+
+# RETURN: Solution đại diện của quỹ đạo: ảnh nhỏ nhất theo thứ tự từ điển
+def canonical(queens):
+    return Solution(min(orbit(queens)))
+
+def is_canonical(queens):
+    return tuple(queens) == min(orbit(queens))
+
+# Các phép đối xứng khác phép đồng nhất, dạng ánh xạ ô (i, j) -> (i', j') trên bàn n x n
+CELL_MAPS = (
+    lambda n, i, j: (j, n - 1 - i),             # quay 90°
+    lambda n, i, j: (n - 1 - i, n - 1 - j),     # quay 180°
+    lambda n, i, j: (n - 1 - j, i),             # quay 270°
+    lambda n, i, j: (i, n - 1 - j),             # gương trái - phải
+    lambda n, i, j: (n - 1 - i, j),             # gương trên - dưới
+    lambda n, i, j: (j, i),                     # đường chéo chính
+    lambda n, i, j: (n - 1 - j, n - 1 - i),     # đường chéo phụ
+)
+
+# RETURN: danh sách hoán vị ô, perm[k] là chỉ số (i' * n + j') của ảnh ô k = i * n + j;
+#         bỏ qua các hoán vị trùng phép đồng nhất (Ex: n = 1)
+def cell_permutations(n):
+    identity = list(range(n * n))
+    perms = []
+    for cell_map in CELL_MAPS:
+        perm = []
+        for i in range(n):
+            for j in range(n):
+                i2, j2 = cell_map(n, i, j)
+                perm.append(i2 * n + j2)
+        if perm != identity and perm not in perms:
+            perms.append(perm)
+    return perms
+
+# PARAMETERS:
+#   clauses: danh sách các mệnh đề đang có
+#   xs, ys: hai dãy biến cùng độ dài
+#   next_aux_var: ID biến tiếp theo để cấp phát các biến phụ
+# RETURN: next_aux_var sau khi thêm ràng buộc xs ≤lex ys (FALSE < TRUE)
+def lex_leq(clauses, xs, ys, next_aux_var):
+    """
+    Các bước (e[t] nghĩa là "xs và ys bằng nhau trên t vị trí đầu", e[0] luôn đúng):
+      - Bỏ các vị trí có x = y (cùng một biến), chúng luôn bằng nhau.
+      - Với mỗi vị trí còn lại t:
+            e[t-1] -> (x ≤ y)           : (¬e[t-1] ∨ ¬x ∨ y)
+            e[t-1] ∧ ¬y -> e[t]         : (¬e[t-1] ∨ y ∨ e[t])
+            e[t-1] ∧ x -> e[t]          : (¬e[t-1] ∨ ¬x ∨ e[t])
+        (khi x ≤ y thì x = y <=> ¬y hoặc x). Vị trí cuối không cần e[t].
+    """
+    pairs = [(x, y) for x, y in zip(xs, ys) if x != y]
+    guard = []
+    for t, (x, y) in enumerate(pairs):
+        clauses.append(guard + [-x, y])
+        if t == len(pairs) - 1:
+            break
+        e = next_aux_var
+        next_aux_var += 1
+        clauses.append(guard + [y, e])
+        clauses.append(guard + [-x, e])
+        guard = [-e]
+    return next_aux_var
+
+# RETURN: bước mã hoá cho generate_clauses(stages=...) thêm ràng buộc lex-leader: với mọi phép đối xứng σ,
+#         vector biến bàn cờ (theo thứ tự hàng) X ≤lex σ(X). Mỗi quỹ đạo chỉ còn lại lời giải nhỏ nhất.
+#         depth: chỉ ràng buộc depth ô đầu tiên (yếu hơn nhưng ít biến phụ hơn), None là toàn bộ bàn cờ.
+# Chỉ đúng khi các ràng buộc khác cũng đối xứng (không dùng cùng hậu đặt sẵn / ô bị chặn không đối xứng).
+def symmetry_breaking(depth=None):
+    def stage(clauses, n, board, next_aux_var):
+        xs = [v for row in board for v in row]
+        for perm in cell_permutations(n):
+            ys = [xs[k] for k in perm]
+            next_aux_var = lex_leq(clauses, xs[:depth], ys[:depth], next_aux_var)
+        return next_aux_var
+    return stage
@@ -0,0 +1,140 @@
+﻿import math
+import numpy as np
+from pysat.solvers import Solver
+
+from NQueensCore import Formula, decode_model
+from NQueensStats import NO_STATS
+
+# Ký tự: ∨
+# Sinh mệnh đề bằng NumPy cho binomial và product: thay vì duyệt từng cặp biến bằng vòng for,
+# các đường (hàng, cột, đường chéo) có cùng độ dài được xếp thành một mảng (k, L)
+# và toàn bộ mệnh đề của chúng được tạo trong một lần theo triu_indices.
+# Mỗi khối mệnh đề là một mảng int32 (số mệnh đề, độ rộng) liên tục trong bộ nhớ.
+
+# RETURN: mảng n x n các ID biến, giống generate_variables
+def board_array(n):
+    return np.arange(1, n * n + 1, dtype=np.int32).reshape(n, n)
+
+# RETURN: dict độ dài L -> mảng (k, L) gồm tất cả đường chéo (cả hai hướng) có L ô, với L ≥ 2
+def diagonals_by_length(board):
+    n = board.shape[0]
+    flipped = np.fliplr(board)
+    groups = {}
+    for offset in range(-(n - 2), n - 1):
+        L = n - abs(offset)
+        groups.setdefault(L, []).append(np.diagonal(board, offset))
+        groups[L].append(np.diagonal(flipped, offset))
+    return {L: np.stack(lines) for L, lines in groups.items()}
+
+# PARAMETERS:
+#   lines: mảng (k, L), mỗi hàng là một đường cần ràng buộc AMO
+# RETURN: mảng (k * L * (L-1) / 2, 2) gồm mọi mệnh đề (-xi ∨ -xj) với i < j trên cùng một đường
+def binomial_amo_block(lines):
+    L = lines.shape[1]
+    first, second = np.triu_indices(L, 1)
+    return np.stack([-lines[:, first], -lines[:, second]], axis=-1).reshape(-1, 2)
+
+# PARAMETERS:
+#   lines: mảng (k, L), mỗi hàng là một đường cần ràng buộc AMO
+#   next_aux_var: ID biến tiếp theo để cấp phát các biến phụ
+# RETURN: (danh sách khối mệnh đề, next_aux_var sau khi cấp phát), cùng cách mã hoá với
+#         NQueensProduct.product_amo: mỗi đường có p biến r và q biến c riêng.
+def product_amo_block(lines, next_aux_var):
+    k, L = lines.shape
+    p = math.ceil(math.sqrt(L))
+    q = math.ceil(L / p)
+
+    # Biến phụ của đường thứ t: r từ base[t] đến base[t]+p-1, c từ base[t]+p đến base[t]+p+q-1
+    base = next_aux_var + np.arange(k, dtype=np.int32)[:, None] * (p + q)
+    idx = np.arange(L, dtype=np.int32)
+    r_of = base + idx // q
+    c_of = base + p + idx % q
+
+    blocks = [
+        np.stack([-lines, r_of], axis=-1).reshape(-1, 2),   # (-x ∨ r_row)
+        np.stack([-lines, c_of], axis=-1).reshape(-1, 2),   # (-x ∨ c_col)
+    ]
+    # AMO theo binomial trên các biến r và trên các biến c
+    if p > 1:
+        blocks.append(binomial_amo_block(base + np.arange(p, dtype=np.int32)))
+    if q > 1:
+        blocks.append(binomial_amo_block(base + p + np.arange(q, dtype=np.int32)))
+    return blocks, next_aux_var + k * (p + q)
+
+# Mệnh đề ALO cho mỗi hàng và mỗi cột
+def exactly_one_alo_blocks(board):
+    return [board, np.ascontiguousarray(board.T)]
+
+# RETURN: (danh sách khối mệnh đề, next_aux_var) cho N-Queens theo binomial
+def binomial_formula(n):
+    board = board_array(n)
+    blocks = exactly_one_alo_blocks(board)
+    blocks.append(binomial_amo_block(board))
+    blocks.append(binomial_amo_block(board.T))
+    for lines in diagonals_by_length(board).values():
+        blocks.append(binomial_amo_block(lines))
+    return blocks, n * n + 1
+
+# RETURN: (danh sách khối mệnh đề, next_aux_var) cho N-Queens theo product
+def product_formula(n):
+    board = board_array(n)
+    blocks = exactly_one_alo_blocks(board)
+    next_aux_var = n * n + 1
+    groups = [np.concatenate([board, board.T])]
+    groups.extend(diagonals_by_length(board).values())
+    for lines in groups:
+        new_blocks, next_aux_var = product_amo_block(lines, next_aux_var)
+        blocks.extend(new_blocks)
+    return blocks, next_aux_var
+
+FORMULAS = {
+    "binomial": binomial_formula,
+    "product": product_formula,
+}
+
+# RETURN: mảng int32 1 chiều gồm các mệnh đề nối tiếp nhau, mỗi mệnh đề kết thúc bằng 0 (như DIMACS)
+def flatten(blocks):
+    parts = []
+    for block in blocks:
+        if len(block):
+            terminated = np.zeros((block.shape[0], block.shape[1] + 1), dtype=np.int32)
+            terminated[:, :-1] = block
+            parts.append(terminated.ravel())
+    if not parts:
+        return np.zeros(0, dtype=np.int32)
+    return np.concatenate(parts)
+
+# RETURN: Formula chứa toàn bộ các khối mệnh đề
+def to_formula(blocks, next_aux_var):
+    return Formula.from_flat(flatten(blocks), nv=next_aux_var - 1)
+
+# Nạp từng khối vào solver; tolist() chạy trong C nên nhanh hơn nhiều so với sinh từng list trong Python.
+def load_blocks(solver, blocks):
+    for block in blocks:
+        solver.append_formula(block.tolist())
+
+# Hàm giải N-Queens với công thức sinh bằng NumPy
+#   stats: SolveStats (NQueensStats) tuỳ chọn
+#   solver_name: solver của pysat
+# RETURN: Solution nếu SATISFIABLE, ngược lại None
+def find_solution_vectorized(n, encoding="product", stats=None, solver_name="glucose3"):
+    if encoding not in FORMULAS:
+        raise ValueError("No vectorized formula for encoding %r, expected one of: %s" % (encoding, ", ".join(FORMULAS)))
+    stats = stats or NO_STATS
+    stats.record(n=n, backend="sat", encoding=encoding, vectorized=True, solver=solver_name)
+    with stats.phase("encode"):
+        blocks, next_aux_var = FORMULAS[encoding](n)
+    stats.count(clauses=sum(len(block) for block in blocks), variables=next_aux_var - 1,
+                aux_vars=next_aux_var - 1 - n * n)
+    solution = None
+    with Solver(name=solver_name) as solver:
+        with stats.phase("load"):
+            load_blocks(solver, blocks)
+        with stats.phase("solve"):
+            sat = solver.solve()
+        if sat:
+            with stats.phase("decode"):
+                solution = decode_model(solver.get_model(), n)
+        stats.solver_stats(solver)
+    stats.finish(solution)
+    return solution
@@ -1,7 +1,8 @@
-﻿# Ký tự: ∨ ∀
+﻿from pysat.solvers import Glucose3
 
-def at_least_one(clauses, variables):
-    clauses.append(variables)
+from NQueensCore import at_least_one, make_encoding, Encoding, generate_variables, generate_clauses, print_solution
+
+# Ký tự: ∨ ∀
 
 # PARAMETERS:   - clauses: danh sách các clause CNF (mỗi clause là list[int]); các clause mới được thêm vào đây.
 #               - X: danh sách các biến gốc (ID kiểu int) cần ràng buộc, X = [X1, X2, …, Xn]
@@ -13,21 +14,32 @@ def new_sequential_counter(clauses, X, k, next_aux):
     Mã hóa ràng buộc New Sequential Counter dựa trên bit-packing
 
     Ý tưởng:
-      Đối với mỗi i (1 ≤ i ≤ n), ta tạo dãy biến phụ R[i] gồm min(i, k) phần tử.
+      Đối với mỗi i (1 ≤ i ≤ n-1), ta tạo dãy biến phụ R[i] gồm min(i, k) phần tử,
+      R[i][j] đúng <=> trong X[1..i] có ít nhất j biến TRUE.
       
       Với i = 1:
-        (1) X[1] -> R[1][1]:  (-X[1] ∨ R[1][0])
-        (5) -X[1] -> -R[1][1]:  (X[1] ∨ -R[1][0])
+        (1) X[1] -> R[1][1]:  (-X[1] ∨ R[1][1])
+        (5) -X[1] -> -R[1][1]:  (X[1] ∨ -R[1][1])
       
-      Với i ≥ 2, với L = min(i+1, k):
-        (2) ∀ j = 2,..., min(i, k):  R[i-1][j] -> R[i][j] : (-R[i-1][j] ∨ R[i][j])
-        (3) ∀ j = 2,..., L:  (X[i] ∧ R[i-1][j-1]) -> R[i][j] : (-X[i] ∨ -R[i-1][j-1] ∨ R[i][j])
-        (4) ∀ j = 1,..., min(|R[i-1]|, L):  (-X[i] ∧ -R[i-1][j]) -> -R[i][j] : (X[i] ∨ R[i-1][j] ∨ -R[i][j])
-        (6) ∀ j = 2,..., L:  -R[i-1][j-1] -> -R[i][j] : (R[i-1][j-1] ∨ -R[i][j])
+      Với 2 ≤ i ≤ n-1:
+        (1) X[i] -> R[i][1] : (-X[i] ∨ R[i][1])
+        (2) ∀ j = 1,..., min(i-1, k):  R[i-1][j] -> R[i][j] : (-R[i-1][j] ∨ R[i][j])
+        (3) ∀ j = 2,..., min(i, k):  (X[i] ∧ R[i-1][j-1]) -> R[i][j] : (-X[i] ∨ -R[i-1][j-1] ∨ R[i][j])
+        (4) ∀ j = 1,..., min(i-1, k):  (-X[i] ∧ -R[i-1][j]) -> -R[i][j] : (X[i] ∨ R[i-1][j] ∨ -R[i][j])
+        (6) ∀ j = 2,..., min(i, k):  -R[i-1][j-1] -> -R[i][j] : (R[i-1][j-1] ∨ -R[i][j])
       
-        (8) Cuối cùng, nếu n > k, thêm clause: (-R[n][k-1]) để đảm bảo tổng số TRUE không vượt quá k.
+      (8) ∀ i = k+1,..., n:  X[i] -> -R[i-1][k] : (-X[i] ∨ -R[i-1][k]) để tổng số TRUE không vượt quá k.
     """
     n = len(X)
+    # k = 0: mọi biến trong X đều phải FALSE.
+    if k <= 0:
+        for x in X:
+            clauses.append([-x])
+        return next_aux
+    # k ≥ n: ràng buộc luôn thoả, không cần mệnh đề nào.
+    if k >= n:
+        return next_aux
+
     R = []  # R[i] sẽ chứa danh sách các biến phụ cho bộ đếm của X[1]...X[i].
     
     # i = 1 (cho X[0])
@@ -39,39 +51,39 @@ def new_sequential_counter(clauses, X, k, next_aux):
     # Công thức (5)
     clauses.append([X[0], -r_vars[0]])
     
-    # Với i từ 2 đến n
-    for i in range(1, n):
+    # Với i từ 2 đến n-1 (X[n] chỉ xuất hiện trong công thức (8))
+    for i in range(1, n - 1):
         L = min(i + 1, k)  # Số bit cho R[i] = min(i+1, k)
         r_vars = []
         for j in range(L):
             r_vars.append(next_aux)
             next_aux += 1
         R.append(r_vars)
+        L_prev = len(R[i-1])  # = min(i, k)
         
+        # Công thức (1)
+        clauses.append([-X[i], R[i][0]])
+
         # Công thức (2)
-        L_prev = min(len(R[i-1]), k)
-        for j in range(1, L_prev):
+        for j in range(L_prev):
             clauses.append([-R[i-1][j], R[i][j]])
         
         # Công thức (3)
         # Ở đây, index chuyển sang 0: với j từ 1 đến L-1, sử dụng R[i-1][j-1] để ảnh hưởng đến R[i][j]
         for j in range(1, L):
-            if j - 1 < len(R[i-1]):
-                clauses.append([-X[i], -R[i-1][j-1], R[i][j]])
+            clauses.append([-X[i], -R[i-1][j-1], R[i][j]])
         
         # Công thức (4)
-        L_common = min(len(R[i-1]), L)
-        for j in range(L_common):
+        for j in range(L_prev):
             clauses.append([X[i], R[i-1][j], -R[i][j]])
         
         # Công thức (6)
         for j in range(1, L):
-            if j - 1 < len(R[i-1]):
-                clauses.append([R[i-1][j-1], -R[i][j]])
+            clauses.append([R[i-1][j-1], -R[i][j]])
     
-    # Công thứ (8)
-    if n > k:
-        clauses.append([-R[n-1][k-1]])
+    # Công thức (8)
+    for i in range(k, n):
+        clauses.append([-X[i], -R[i-1][k-1]])
     
     return next_aux
 
@@ -83,6 +95,18 @@ def nsc_at_least_k(clauses, X, k, next_aux):
     Mã hóa at least k dựa trên at most (n-k)
     """
     n = len(X)
+    # k ≤ 0: ràng buộc luôn thoả, không cần mệnh đề nào.
+    if k <= 0:
+        return next_aux
+    # k > n: không thể có k biến TRUE, thêm clause rỗng để công thức UNSAT
+    # (at most (n - k) với n - k < 0 sẽ ép mọi Y FALSE, tức mọi X TRUE, là sai).
+    if k > n:
+        clauses.append([])
+        return next_aux
+    # k = 1 chỉ cần một clause ALO, không cần bộ đếm trên n - 1 biến phủ định
+    if k == 1:
+        at_least_one(clauses, X)
+        return next_aux
     Y = [-x for x in X]
     # Số lượng biến Y đúng ≤ (n - k) <=> "at most (n - k)" constraint on Y.
     next_aux = new_sequential_counter(clauses, Y, n - k, next_aux)
@@ -93,16 +117,58 @@ def nsc_exactly_k(clauses, X, k, next_aux):
     next_aux = nsc_at_least_k(clauses, X, k, next_aux)
     return next_aux
 
-# Gọi 5 biến X1, X2, X3, X4, X5
-X = [1, 2, 3, 4, 5]
-clauses = []
-next_aux = 6  # Các biến gốc có ID từ 1 đến 5, nên biến phụ bắt đầu từ 6.
+# Dạng k = 1 với cùng chữ ký như các encoding khác, dùng cho N-Queens.
+def nsc_at_most_one(clauses, X, next_aux):
+    return nsc_at_most_k(clauses, X, 1, next_aux)
+
+def nsc_exactly_one(clauses, X, next_aux):
+    return nsc_exactly_k(clauses, X, 1, next_aux)
+
+NSC = make_encoding(nsc_exactly_one, nsc_at_most_one)
+
+# PARAMETERS:
+#   k: số hậu chính xác trên mỗi hàng và mỗi cột (k = 1 là N-Queens thông thường)
+#   diag_k: số hậu tối đa trên mỗi đường chéo
+# RETURN: Encoding dùng NSC cho mọi ràng buộc của biến thể tổng quát
+def nsc_encoding(k=1, diag_k=1):
+    if k == 1 and diag_k == 1:
+        return NSC
+
+    def exactly_k(clauses, X, next_aux):
+        return nsc_exactly_k(clauses, X, k, next_aux)
+
+    def at_most_diag_k(clauses, X, next_aux):
+        return nsc_at_most_k(clauses, X, diag_k, next_aux)
+
+    return Encoding(exactly_k, exactly_k, at_most_diag_k)
+
+# Hàm giải biến thể N-Queens tổng quát bằng NSC: đúng k hậu trên mỗi hàng và mỗi cột,
+# tối đa diag_k hậu trên mỗi đường chéo.
+# RETURN: ma trận bàn cờ 0/1 nếu SATISFIABLE, ngược lại None
+def solve_nqueens_nsc(n, k=1, diag_k=1):
+    board = generate_variables(n)
+    clauses, _ = generate_clauses(n, board, nsc_encoding(k, diag_k))
+
+    with Glucose3(bootstrap_with=clauses) as solver:
+        if solver.solve():
+            model = solver.get_model()
+            return [[int(model[i * n + j] > 0) for j in range(n)] for i in range(n)]
+        return None
+
+if __name__ == "__main__":
+    # Gọi 5 biến X1, X2, X3, X4, X5
+    X = [1, 2, 3, 4, 5]
+    clauses = []
+    next_aux = 6  # Các biến gốc có ID từ 1 đến 5, nên biến phụ bắt đầu từ 6.
     
-# Ví dụ: Mã hoá ràng buộc "at most 2" trên X: ≤2 biến TRUE.
-next_aux = nsc_at_most_k(clauses, X, 2, next_aux)
+    # Ví dụ: Mã hoá ràng buộc "at most 2" trên X: ≤2 biến TRUE.
+    next_aux = nsc_at_most_k(clauses, X, 2, next_aux)
     
-# In ra các clause đã sinh ra:
-print("Các clause của NSC (At Most 2):")
-for cl in clauses:
-    print(cl)
+    # In ra các clause đã sinh ra:
+    print("Các clause của NSC (At Most 2):")
+    for cl in clauses:
+        print(cl)
+
+    # Ví dụ: bàn cờ 8 x 8 với đúng 2 hậu trên mỗi hàng, mỗi cột và tối đa 2 hậu trên mỗi đường chéo.
+    print_solution(solve_nqueens_nsc(8, k=2, diag_k=2))
 